@@ -11,6 +11,7 @@ from app.models.francheasy import Francheasy
 from app.models.store import Store
 from app.models.povilions import Povilions
 from app.models.business import Business
+from app.models.business_transaction import BusinessTransaction
 from app.models.business_request import BusinessRequest
 from app.core.config import DatabaseSettings
 
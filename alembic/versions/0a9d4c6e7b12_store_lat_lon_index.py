@@ -0,0 +1,26 @@
+"""store latitude/longitude index
+
+Revision ID: 0a9d4c6e7b12
+Revises: f3c71a9e2d58
+Create Date: 2026-10-18 14:02:45.871903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a9d4c6e7b12'
+down_revision: Union[str, None] = 'f3c71a9e2d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_stores_latitude_longitude', 'stores', ['latitude', 'longitude'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stores_latitude_longitude', table_name='stores')
@@ -0,0 +1,165 @@
+"""+business_transactions
+
+Revision ID: 4f1c2a9d7e10
+Revises: b70d0d1cde87
+Create Date: 2026-10-18 10:12:31.418207
+
+"""
+from datetime import datetime
+import logging
+from typing import Sequence, Union
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1c2a9d7e10'
+down_revision: Union[str, None] = 'b70d0d1cde87'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+# Старые записи в JSON бывали без type, а колонка NOT NULL. JSON-колонка после
+# переноса удаляется, поэтому такие записи не пропускаются, а получают этот тип.
+LEGACY_TRANSACTION_TYPE = 'unknown'
+
+logger = logging.getLogger(f'alembic.runtime.migration.{revision}')
+
+business_table = sa.table(
+    'business',
+    sa.column('business_id', sa.UUID()),
+    sa.column('transactions', sa.JSON()),
+    sa.column('created_at', sa.DateTime()),
+)
+
+transactions_table = sa.table(
+    'business_transactions',
+    sa.column('transaction_id', sa.UUID()),
+    sa.column('business_id', sa.UUID()),
+    sa.column('type', sa.String()),
+    sa.column('amount', sa.Float()),
+    sa.column('description', sa.String()),
+    sa.column('date', sa.DateTime()),
+)
+
+
+def _parse_date(value, fallback):
+    if value:
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            pass
+    return fallback or datetime.now()
+
+
+def _parse_amount(value):
+    """Сумма из старого JSON: число или строка вида "1 000,50"; None, если разобрать нельзя."""
+    if value is None or value == '':
+        return 0.0
+    if isinstance(value, str):
+        value = value.replace('\u00a0', '').replace(' ', '').replace(',', '.')
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _backfill_transactions() -> None:
+    bind = op.get_bind()
+    last_business_id = None
+    untyped = 0
+    malformed = 0
+    bad_amount = 0
+    while True:
+        query = (
+            sa.select(business_table.c.business_id, business_table.c.transactions, business_table.c.created_at)
+            .where(business_table.c.transactions.isnot(None))
+            .order_by(business_table.c.business_id)
+            .limit(BATCH_SIZE)
+        )
+        if last_business_id is not None:
+            query = query.where(business_table.c.business_id > last_business_id)
+        rows = bind.execute(query).all()
+        if not rows:
+            break
+
+        values = []
+        for business_id, transactions, created_at in rows:
+            for transaction in transactions or []:
+                if not isinstance(transaction, dict):
+                    malformed += 1
+                    continue
+                amount = _parse_amount(transaction.get('amount'))
+                if amount is None:
+                    bad_amount += 1
+                    logger.warning(f"Skipping legacy transaction of business {business_id} with amount {transaction.get('amount')!r}")
+                    continue
+                transaction_type = transaction.get('type')
+                if not transaction_type:
+                    untyped += 1
+                    transaction_type = LEGACY_TRANSACTION_TYPE
+                values.append({
+                    'transaction_id': uuid.uuid4(),
+                    'business_id': business_id,
+                    'type': transaction_type,
+                    'amount': amount,
+                    'description': transaction.get('description'),
+                    'date': _parse_date(transaction.get('date'), created_at),
+                })
+        if values:
+            bind.execute(transactions_table.insert(), values)
+        last_business_id = rows[-1].business_id
+
+    if untyped:
+        logger.warning(f"{untyped} legacy transactions had no type and were stored as '{LEGACY_TRANSACTION_TYPE}'")
+    if malformed:
+        logger.warning(f"{malformed} legacy transaction entries were not JSON objects and were skipped")
+    if bad_amount:
+        logger.warning(f"{bad_amount} legacy transactions had a non-numeric amount and were skipped")
+
+
+def upgrade() -> None:
+    op.create_table('business_transactions',
+    sa.Column('transaction_id', sa.UUID(), nullable=False),
+    sa.Column('business_id', sa.UUID(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('date', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['business_id'], ['business.business_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('transaction_id')
+    )
+    op.create_index('ix_business_transactions_business_id_date', 'business_transactions', ['business_id', 'date'], unique=False)
+
+    _backfill_transactions()
+
+    op.drop_column('business', 'transactions')
+
+
+def downgrade() -> None:
+    op.add_column('business', sa.Column('transactions', sa.JSON(), autoincrement=False, nullable=True))
+    op.execute(
+        """
+        UPDATE business b
+        SET transactions = COALESCE(
+            (
+                SELECT json_agg(
+                    json_build_object(
+                        'type', t.type,
+                        'amount', t.amount,
+                        'description', t.description,
+                        'date', to_char(t.date, 'YYYY-MM-DD"T"HH24:MI:SS.US')
+                    )
+                    ORDER BY t.date
+                )
+                FROM business_transactions t
+                WHERE t.business_id = b.business_id
+            ),
+            '[]'::json
+        )
+        """
+    )
+    op.drop_index('ix_business_transactions_business_id_date', table_name='business_transactions')
+    op.drop_table('business_transactions')
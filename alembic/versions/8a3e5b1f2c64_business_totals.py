@@ -0,0 +1,47 @@
+"""+business totals
+
+Revision ID: 8a3e5b1f2c64
+Revises: 4f1c2a9d7e10
+Create Date: 2026-10-18 11:02:47.903114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a3e5b1f2c64'
+down_revision: Union[str, None] = '4f1c2a9d7e10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('business', sa.Column('total_income', sa.Float(), server_default='0', nullable=False))
+    op.add_column('business', sa.Column('total_expense', sa.Float(), server_default='0', nullable=False))
+    op.add_column('business', sa.Column('transaction_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        """
+        UPDATE business b
+        SET total_income = t.total_income,
+            total_expense = t.total_expense,
+            transaction_count = t.transaction_count
+        FROM (
+            SELECT business_id,
+                   COALESCE(SUM(amount) FILTER (WHERE type = 'income'), 0) AS total_income,
+                   COALESCE(SUM(amount) FILTER (WHERE type = 'expense'), 0) AS total_expense,
+                   COUNT(*) AS transaction_count
+            FROM business_transactions
+            GROUP BY business_id
+        ) t
+        WHERE b.business_id = t.business_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('business', 'transaction_count')
+    op.drop_column('business', 'total_expense')
+    op.drop_column('business', 'total_income')
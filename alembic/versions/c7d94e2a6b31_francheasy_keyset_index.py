@@ -0,0 +1,26 @@
+"""francheasy keyset index
+
+Revision ID: c7d94e2a6b31
+Revises: 8a3e5b1f2c64
+Create Date: 2026-10-18 11:40:05.276391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d94e2a6b31'
+down_revision: Union[str, None] = '8a3e5b1f2c64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_francheasy_created_at_id', 'francheasy', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_francheasy_created_at_id', table_name='francheasy')
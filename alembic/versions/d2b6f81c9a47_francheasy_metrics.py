@@ -0,0 +1,39 @@
+"""francheasy financial metrics
+
+Revision ID: d2b6f81c9a47
+Revises: c7d94e2a6b31
+Create Date: 2026-10-18 12:15:52.640018
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b6f81c9a47'
+down_revision: Union[str, None] = 'c7d94e2a6b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('francheasy', sa.Column(
+        'payback_period',
+        sa.Float(),
+        sa.Computed('CASE WHEN ebitda > 0 THEN start_capital / ebitda END', persisted=True),
+        nullable=True,
+    ))
+    op.create_index('ix_francheasy_ebitda_id', 'francheasy', ['ebitda', 'id'], unique=False)
+    op.create_index('ix_francheasy_start_capital_id', 'francheasy', ['start_capital', 'id'], unique=False)
+    op.create_index('ix_francheasy_open_store_id', 'francheasy', ['open_store', 'id'], unique=False)
+    op.create_index('ix_francheasy_payback_period_id', 'francheasy', ['payback_period', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_francheasy_payback_period_id', table_name='francheasy')
+    op.drop_index('ix_francheasy_open_store_id', table_name='francheasy')
+    op.drop_index('ix_francheasy_start_capital_id', table_name='francheasy')
+    op.drop_index('ix_francheasy_ebitda_id', table_name='francheasy')
+    op.drop_column('francheasy', 'payback_period')
@@ -0,0 +1,33 @@
+"""francheasy title full-text search
+
+Revision ID: e5a08c3d1f92
+Revises: d2b6f81c9a47
+Create Date: 2026-10-18 12:58:19.114730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a08c3d1f92'
+down_revision: Union[str, None] = 'd2b6f81c9a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('francheasy', sa.Column(
+        'title_tsv',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('russian', coalesce(title, ''))", persisted=True),
+        nullable=True,
+    ))
+    op.create_index('ix_francheasy_title_tsv', 'francheasy', ['title_tsv'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_francheasy_title_tsv', table_name='francheasy', postgresql_using='gin')
+    op.drop_column('francheasy', 'title_tsv')
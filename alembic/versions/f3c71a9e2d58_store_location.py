@@ -0,0 +1,52 @@
+"""store location geography
+
+Revision ID: f3c71a9e2d58
+Revises: e5a08c3d1f92
+Create Date: 2026-10-18 13:24:07.506311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import geoalchemy2
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c71a9e2d58'
+down_revision: Union[str, None] = 'e5a08c3d1f92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _postgis_available() -> bool:
+    bind = op.get_bind()
+    return bool(bind.execute(sa.text(
+        "SELECT 1 FROM pg_available_extensions WHERE name = 'postgis'"
+    )).scalar())
+
+
+def _has_location_column() -> bool:
+    return 'location' in {column['name'] for column in sa.inspect(op.get_bind()).get_columns('stores')}
+
+
+def upgrade() -> None:
+    # Инсталляции без PostGIS работают на STORE_GEO_BACKEND=memory и колонку не получают
+    if not _postgis_available():
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS postgis')
+    # Generated column заполняется для существующих строк при ALTER TABLE
+    op.add_column('stores', sa.Column(
+        'location',
+        geoalchemy2.types.Geography(geometry_type='POINT', srid=4326, spatial_index=False),
+        sa.Computed('ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography', persisted=True),
+        nullable=True,
+    ))
+    op.create_index('ix_stores_location', 'stores', ['location'], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    if not _has_location_column():
+        return
+    op.drop_index('ix_stores_location', table_name='stores', postgresql_using='gist')
+    op.drop_column('stores', 'location')
@@ -1,4 +1,4 @@
-from app.models import users, francheasy, store, povilions, business, business_request
+from app.models import users, francheasy, store, povilions, business, business_transaction, business_request
 
 from .api import api_router
 from .main import app
@@ -25,6 +25,8 @@ from app.utils.security import (
     create_refresh_token,
     refresh_access_token,
 )
+from app.utils.login_timings import login_timings
+from app.utils.rate_limit import rate_limit
 from app.utils.vk_auth import generate_auth_url, validate_callback, get_vk_user_info, vk_auth
 from fastapi import FastAPI, Request
 
@@ -38,7 +40,7 @@ async def button_placeholders_vk():
     auth_url, session_id = await generate_auth_url()
     return RedirectResponse(auth_url)
 
-@auth_router.get("/vk/callback")
+@auth_router.get("/vk/callback", dependencies=[Depends(rate_limit("vk_callback"))])
 async def vk_oauth_callback(
     request: Request, 
     db: AsyncSession = Depends(get_db)
@@ -54,19 +56,22 @@ async def vk_oauth_callback(
         
         code_verifier, vk_access_token, vk_user_id = await validate_callback(code, state, device_id)
         
-        vk_user_info = await get_vk_user_info(vk_access_token, vk_user_id)
+        with login_timings.stage("users_get"):
+            vk_user_info = await get_vk_user_info(vk_access_token, vk_user_id)
         
         if not vk_user_info or not vk_user_info.get("id"):
             raise HTTPException(status_code=400, detail="Could not get user info from VK")
         vk_json = json.dumps(vk_user_info)
         
         user_service = UserService(db)
-        user_id = await user_service.create_or_get_vk_user(
-            vk_id=str(vk_user_info["id"]), 
-            vk_json=vk_json
-        )
+        with login_timings.stage("db"):
+            user_id = await user_service.create_or_get_vk_user(
+                vk_id=str(vk_user_info["id"]), 
+                vk_json=vk_json
+            )
         
-        refresh_token, jwt_access_token = await vk_auth(vk_user_info, user_id, db)
+        with login_timings.stage("jwt"):
+            refresh_token, jwt_access_token = await vk_auth(vk_user_info, user_id, db)
         
         return Token(
             access_token=jwt_access_token,
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from typing import List
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.models.users import Users
 from app.services.business_service import BusinessService
 from app.services.s3_service import s3_service
@@ -12,6 +12,7 @@ from app.schemas.business import (
     TransactionCreate,
     TransactionRead
 )
+from app.utils.rate_limit import rate_limit
 from app.utils.security import get_current_user
 from datetime import datetime
 
@@ -21,40 +22,15 @@ business_router = APIRouter()
 @business_router.get("/my", response_model=List[BusinessListItem])
 async def list_my_businesses(
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = BusinessService(db)
-    businesses_list = await service.get_businesses_by_user(current_user.id)
+    businesses_list = await service.get_businesses_with_details_by_user(current_user.id)
     
     result = []
-    for b in businesses_list:
+    for b, francheasy_title, store_address, povilion_title in businesses_list:
         totals = service.calculate_totals(b)
         
-        francheasy_title = None
-        store_address = None
-        povilion_title = None
-        
-        from app.services.francheasy import FrancheasyService
-        from app.services.store_service import StoreService
-        from app.services.povilions_service import PovilionsService
-        
-        francheasy_service = FrancheasyService(db)
-        francheasy = await francheasy_service.get_francheasy_by_id(str(b.francheasy_id))
-        if francheasy:
-            francheasy_title = francheasy.title
-        
-        if b.store_id:
-            store_service = StoreService(db)
-            store = await store_service.get_store_by_id(b.store_id)
-            if store:
-                store_address = store.adress
-        
-        if b.povilion_id:
-            povilions_service = PovilionsService(db)
-            povilion = await povilions_service.get_povilion_by_id(b.povilion_id)
-            if povilion:
-                povilion_title = povilion.title
-        
         result.append(
             {
                 "business_id": b.business_id,
@@ -77,7 +53,7 @@ async def list_my_businesses(
 async def get_business_details(
     business_id: UUID,
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = BusinessService(db)
     business = await service.get_business_by_id(business_id)
@@ -118,12 +94,12 @@ async def get_business_details(
             povilion_title = povilion.title
     
     transactions = []
-    for t in (business.transactions if business.transactions else []):
+    for t in await service.get_transactions(business_id):
         transactions.append({
-            "type": t.get("type"),
-            "amount": t.get("amount"),
-            "description": t.get("description"),
-            "date": t.get("date")
+            "type": t.type,
+            "amount": t.amount,
+            "description": t.description,
+            "date": t.date
         })
     
     return {
@@ -141,7 +117,7 @@ async def get_business_details(
     }
 
 
-@business_router.post("/{business_id}/transaction")
+@business_router.post("/{business_id}/transaction", dependencies=[Depends(rate_limit("business_transaction", per_user=True))])
 async def add_transaction(
     business_id: UUID,
     transaction: TransactionCreate,
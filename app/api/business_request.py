@@ -1,18 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from typing import List
-from app.db.database import get_db
+from typing import List, Optional
+from app.db.database import get_db, get_read_db
 from app.models.users import Users
 from app.services.business_request_service import BusinessRequestService
-from app.services.francheasy import FrancheasyService
-from app.services.store_service import StoreService
-from app.services.povilions_service import PovilionsService
 from app.schemas.business_request import (
     BusinessRequestCreate, 
     BusinessRequestRead, 
     BusinessRequestUpdate,
-    BusinessRequestListItem
+    BusinessRequestListItem,
+    RequestStatus
 )
 from app.utils.security import get_current_user
 
@@ -34,98 +32,22 @@ async def create_business_request(
 
 @business_request_router.get("/my", response_model=List[BusinessRequestListItem])
 async def list_my_requests(
+    request_status: Optional[RequestStatus] = Query(None, alias="status"),
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = BusinessRequestService(db)
-    requests_list = await service.get_requests_by_user(current_user.id)
-    
-    result = []
-    for r in requests_list:
-        francheasy_service = FrancheasyService(db)
-        francheasy = await francheasy_service.get_francheasy_by_id(str(r.francheasy_id))
-        francheasy_title = francheasy.title if francheasy else None
-        
-        store_title = None
-        if r.store_id:
-            store_service = StoreService(db)
-            store = await store_service.get_store_by_id(r.store_id)
-            if store:
-                store_title = store.title
-        
-        povilion_title = None
-        povilion_price = None
-        if r.povilion_id:
-            povilions_service = PovilionsService(db)
-            povilion = await povilions_service.get_povilion_by_id(r.povilion_id)
-            if povilion:
-                povilion_title = povilion.title
-                povilion_price = povilion.price
-        
-        result.append(
-            BusinessRequestListItem(
-                request_id=r.request_id,
-                user_id=r.user_id,
-                francheasy_id=r.francheasy_id,
-                francheasy_title=francheasy_title,
-                store_id=r.store_id,
-                store_title=store_title,
-                povilion_id=r.povilion_id,
-                povilion_title=povilion_title,
-                povilion_price=povilion_price,
-                status=r.status,
-                created_at=r.created_at
-            )
-        )
-    return result
+    return await service.get_request_list_items(user_id=current_user.id, status=request_status)
 
 
 @business_request_router.get("/francheasy", response_model=List[BusinessRequestListItem])
 async def list_francheasy_requests(
+    request_status: Optional[RequestStatus] = Query(None, alias="status"),
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = BusinessRequestService(db)
-    requests_list = await service.get_requests_by_francheasy_owner(current_user.id)
-    
-    result = []
-    for r in requests_list:
-        francheasy_service = FrancheasyService(db)
-        francheasy = await francheasy_service.get_francheasy_by_id(str(r.francheasy_id))
-        francheasy_title = francheasy.title if francheasy else None
-        
-        store_title = None
-        if r.store_id:
-            store_service = StoreService(db)
-            store = await store_service.get_store_by_id(r.store_id)
-            if store:
-                store_title = store.title
-        
-        povilion_title = None
-        povilion_price = None
-        if r.povilion_id:
-            povilions_service = PovilionsService(db)
-            povilion = await povilions_service.get_povilion_by_id(r.povilion_id)
-            if povilion:
-                povilion_title = povilion.title
-                povilion_price = povilion.price
-        
-        result.append(
-            BusinessRequestListItem(
-                request_id=r.request_id,
-                user_id=r.user_id,
-                francheasy_id=r.francheasy_id,
-                francheasy_title=francheasy_title,
-                store_id=r.store_id,
-                store_title=store_title,
-                povilion_id=r.povilion_id,
-                povilion_title=povilion_title,
-                povilion_price=povilion_price,
-                status=r.status,
-                created_at=r.created_at
-            )
-        )
-    return result
+    return await service.get_request_list_items(francheasy_owner_id=current_user.id, status=request_status)
 
 
 @business_request_router.put("/{request_id}/status", response_model=BusinessRequestRead)
@@ -159,7 +81,7 @@ async def update_request_status(
 async def get_request_details(
     request_id: UUID,
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = BusinessRequestService(db)
     request = await service.get_request_by_id(request_id)
@@ -1,15 +1,29 @@
 from fastapi import APIRouter, Request, Form, Depends, HTTPException, status, Header
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from fastapi.openapi.docs import get_swagger_ui_html, get_redoc_html
 from fastapi.templating import Jinja2Templates
 from app.core.config import DocsSettings
 from app.services.session_service import session_service
+from app.utils.http_cache import PRIVATE_CACHE_CONTROL, cache_headers, conditional_response
+from app.utils.openapi_cache import openapi_cache
 
 
 docs_router = APIRouter()
 docs_settings = DocsSettings()
 templates = Jinja2Templates(directory="app/templates")
 
+async def require_docs_access(request: Request):
+    """Служебные эндпоинты: сессия /docs или заголовок X-API-Key с ключом документации."""
+    session_token = request.cookies.get("docs_session")
+    authorized = bool(session_token and await session_service.is_valid_session(session_token))
+    
+    if not authorized:
+        api_key = request.headers.get("X-API-Key")
+        authorized = bool(api_key and api_key == docs_settings.docs_api_key)
+    
+    if not authorized:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
 @docs_router.get("/docs", include_in_schema=False)
 async def docs_login_page(request: Request):
     return templates.TemplateResponse(
@@ -21,9 +35,15 @@ async def docs_login_page(request: Request):
 async def docs_auth(request: Request, api_key: str = Form()):
     if api_key == docs_settings.docs_api_key:
         session_token = session_service.create_session_token()
-        session_service.add_session(session_token)
+        await session_service.add_session(session_token)
         response = RedirectResponse(url="/docs/swagger", status_code=302)
-        response.set_cookie(key="docs_session", value=session_token, httponly=True)
+        response.set_cookie(
+            key="docs_session",
+            value=session_token,
+            max_age=docs_settings.docs_session_max_age,
+            httponly=True,
+            samesite="lax",
+        )
         return response
     else:
         return templates.TemplateResponse(
@@ -35,7 +55,7 @@ async def docs_auth(request: Request, api_key: str = Form()):
 @docs_router.get("/docs/swagger", include_in_schema=False)
 async def get_swagger_ui_documentation(request: Request):
     session_token = request.cookies.get("docs_session")
-    if not session_token or not session_service.is_valid_session(session_token):
+    if not session_token or not await session_service.is_valid_session(session_token):
         return RedirectResponse(url="/docs", status_code=302)
     
     return get_swagger_ui_html(
@@ -54,9 +74,15 @@ async def redoc_login_page(request: Request):
 async def redoc_auth(request: Request, api_key: str = Form()):
     if api_key == docs_settings.docs_api_key:
         session_token = session_service.create_session_token()
-        session_service.add_session(session_token)
+        await session_service.add_session(session_token)
         response = RedirectResponse(url="/redoc/view", status_code=302)
-        response.set_cookie(key="docs_session", value=session_token, httponly=True)
+        response.set_cookie(
+            key="docs_session",
+            value=session_token,
+            max_age=docs_settings.docs_session_max_age,
+            httponly=True,
+            samesite="lax",
+        )
         return response
     else:
         return templates.TemplateResponse(
@@ -68,7 +94,7 @@ async def redoc_auth(request: Request, api_key: str = Form()):
 @docs_router.get("/redoc/view", include_in_schema=False)
 async def get_redoc_documentation(request: Request):
     session_token = request.cookies.get("docs_session")
-    if not session_token or not session_service.is_valid_session(session_token):
+    if not session_token or not await session_service.is_valid_session(session_token):
         return RedirectResponse(url="/redoc", status_code=302)
     
     return get_redoc_html(
@@ -76,32 +102,15 @@ async def get_redoc_documentation(request: Request):
         title="Absolute API - ReDoc"
     )
 
-@docs_router.get("/openapi.json", include_in_schema=False)
+@docs_router.get("/openapi.json", include_in_schema=False, dependencies=[Depends(require_docs_access)])
 async def get_openapi_schema(request: Request):
-    
-    session_token = request.cookies.get("docs_session")
-    if session_token and session_service.is_valid_session(session_token):
-
-        from fastapi.openapi.utils import get_openapi
-        from app.main import app
-        
-        return get_openapi(
-            title=app.title,
-            version=app.version,
-            description=app.description,
-            routes=app.routes,
-        )
-    
-    api_key = request.headers.get("X-API-Key")
-    if api_key and api_key == docs_settings.docs_api_key:
-        from fastapi.openapi.utils import get_openapi
-        from app.main import app
-        
-        return get_openapi(
-            title=app.title,
-            version=app.version,
-            description=app.description,
-            routes=app.routes,
-        )
-    
-    raise HTTPException(status_code=401, detail="Unauthorized")
\ No newline at end of file
+    body, encoding, etag = openapi_cache.get(request)
+    headers = cache_headers(etag, PRIVATE_CACHE_CONTROL)
+    headers["Vary"] = "Accept-Encoding"
+    not_modified = conditional_response(request, etag, PRIVATE_CACHE_CONTROL)
+    if not_modified:
+        not_modified.headers["Vary"] = "Accept-Encoding"
+        return not_modified
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
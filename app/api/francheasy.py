@@ -1,16 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.db.database import get_db
+import uuid
+from app.db.database import get_db, get_read_db
 from app.models.users import Users
-from app.services.francheasy import FrancheasyService
-from app.schemas.francheasy import FrancheasyResponse, FrancheasyUpdate, FrancheasyUpdateResponse
+from app.services.francheasy import FrancheasyService, detail_cache_keys, francheasy_cache, list_cache_keys
+from app.models.francheasy import Francheasy
+from app.schemas.francheasy import (
+    FrancheasyFilters,
+    FrancheasyPage,
+    FrancheasyResponse,
+    FrancheasySort,
+    FrancheasyUpdate,
+    FrancheasyUpdateResponse,
+    SortOrder,
+)
+from app.utils.http_cache import CATALOG_CACHE_CONTROL, body_etag, cache_headers, conditional_response
+from app.utils.rate_limit import rate_limit
 from app.utils.security import get_current_user
-from app.services.s3_service import s3_service
+from app.services.s3_service import UploadTooLargeError, s3_service
 
 francheasy_router = APIRouter()
 
-@francheasy_router.post("/", response_model=FrancheasyResponse, status_code=status.HTTP_201_CREATED)
+def _check_upload_sizes(files: Optional[List[UploadFile]]):
+    try:
+        for f in files or []:
+            s3_service.check_upload_size(f)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+
+async def _francheasy_to_dict(francheasy: Francheasy) -> dict:
+    francheasy_data = {
+        "id": francheasy.id,
+        "user_id": francheasy.user_id,
+        "title": francheasy.title,
+        "ebitda": francheasy.ebitda,
+        "open_store": francheasy.open_store,
+        "start_capital": francheasy.start_capital,
+        "payback_period": francheasy.payback_period,
+        "s3_photo_francheasy_keys": francheasy.s3_photo_francheasy_keys,
+        "created_at": francheasy.created_at,
+        "updated_at": francheasy.updated_at,
+    }
+    try:
+        keys = francheasy.s3_photo_francheasy_keys or []
+        if keys:
+            francheasy_data["photo_urls"] = [await s3_service.generate_presigned_url(k) for k in keys]
+            francheasy_data["preview_photo_url"] = francheasy_data["photo_urls"][0]
+    except Exception:
+        pass
+    return francheasy_data
+
+@francheasy_router.post(
+    "/",
+    response_model=FrancheasyResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("francheasy_create", per_user=True))],
+)
 async def create_francheasy(
     phone_number: str = Form(...,),
     ebitda: float = Form(...,),
@@ -22,6 +68,8 @@ async def create_francheasy(
     current_user: Users = Depends(get_current_user),
 ):
     service = FrancheasyService(db)
+    # До создания записи: иначе слишком большой файл оставил бы её без фото
+    _check_upload_sizes(files)
     
     try:
         from app.schemas.francheasy import FrancheasyCreate
@@ -42,9 +90,7 @@ async def create_francheasy(
                 key = await s3_service.upload_file_get_key(car_id=str(francheasy.id), file=f, folder="francheasy-photos")
                 uploaded_keys.append(key)
             
-            francheasy.s3_photo_francheasy_keys = uploaded_keys
-            await db.commit()
-            await db.refresh(francheasy)
+            francheasy = await service.add_francheasy_photos(str(francheasy.id), uploaded_keys)
         
         # Генерируем URL для фото
         photo_urls = []
@@ -66,100 +112,102 @@ async def create_francheasy(
             created_at=francheasy.created_at,
             updated_at=francheasy.updated_at,
         )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating francheasy: {str(e)}")
 
-@francheasy_router.get("/list", response_model=List[FrancheasyResponse])
+@francheasy_router.get("/list", response_model=FrancheasyPage)
 async def list_francheasy(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    sort: FrancheasySort = Query(FrancheasySort.CREATED_AT),
+    order: SortOrder = Query(SortOrder.DESC),
+    filters: FrancheasyFilters = Depends(),
+    # Тело попадает в кэш ответов под текущим поколением, поэтому собирается из primary:
+    # отстающая реплика закэшировала бы уже инвалидированные данные
     db: AsyncSession = Depends(get_db),
 ):
     service = FrancheasyService(db)
-    francheasy_list = await service.get_all_francheasy()
-    
-    enriched_francheasy = []
-    for francheasy in francheasy_list:
-        francheasy_data = {
-            "id": francheasy.id,
-            "user_id": francheasy.user_id,
-            "title": francheasy.title,
-            "open_store": francheasy.open_store,
-            "start_capital": francheasy.start_capital,
-            "s3_photo_francheasy_keys": francheasy.s3_photo_francheasy_keys,
-            "created_at": francheasy.created_at,
-            "updated_at": francheasy.updated_at,
-        }
+
+    async def build() -> bytes:
         try:
-            keys = francheasy.s3_photo_francheasy_keys or []
-            if keys:
-                francheasy_data["photo_urls"] = [await s3_service.generate_presigned_url(k) for k in keys]
-                francheasy_data["preview_photo_url"] = francheasy_data["photo_urls"][0]
-        except Exception:
-            pass
+            francheasy_list, next_cursor = await service.get_francheasy_page(limit, cursor, filters, sort, order)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        enriched_francheasy.append(francheasy_data)
+        return FrancheasyPage.model_validate({
+            "items": [await _francheasy_to_dict(francheasy) for francheasy in francheasy_list],
+            "next_cursor": next_cursor,
+        }).model_dump_json().encode()
+
+    key, gen_key = list_cache_keys(request.url.path, request.query_params.multi_items())
+    body = await francheasy_cache.get_or_set(key, gen_key, build)
+    # ETag из тела: при попадании в кэш ответа запрос не доходит до БД даже за версией
+    etag = body_etag(body)
+    not_modified = conditional_response(request, etag, CATALOG_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return Response(content=body, media_type="application/json", headers=cache_headers(etag, CATALOG_CACHE_CONTROL))
+
+@francheasy_router.get("/search", response_model=FrancheasyPage)
+async def search_francheasy(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    service = FrancheasyService(db)
+    try:
+        francheasy_list, next_cursor = await service.search_francheasy(q, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return enriched_francheasy
+    return {
+        "items": [await _francheasy_to_dict(francheasy) for francheasy in francheasy_list],
+        "next_cursor": next_cursor,
+    }
 
 @francheasy_router.get("/user", response_model=List[FrancheasyResponse])
 async def list_my_francheasy(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: Users = Depends(get_current_user),
 ):
     service = FrancheasyService(db)
     francheasy_list = await service.get_francheasy_by_user(str(current_user.id))
     
-    enriched_francheasy = []
-    for francheasy in francheasy_list:
-        francheasy_data = {
-            "id": francheasy.id,
-            "user_id": francheasy.user_id,
-            "title": francheasy.title,
-            "open_store": francheasy.open_store,
-            "start_capital": francheasy.start_capital,
-            "s3_photo_francheasy_keys": francheasy.s3_photo_francheasy_keys,
-            "created_at": francheasy.created_at,
-            "updated_at": francheasy.updated_at,
-        }
-        try:
-            keys = francheasy.s3_photo_francheasy_keys or []
-            if keys:
-                francheasy_data["photo_urls"] = [await s3_service.generate_presigned_url(k) for k in keys]
-                francheasy_data["preview_photo_url"] = francheasy_data["photo_urls"][0]
-        except Exception:
-            pass
-        enriched_francheasy.append(francheasy_data)
-    return enriched_francheasy
+    return [await _francheasy_to_dict(francheasy) for francheasy in francheasy_list]
 
 @francheasy_router.get("/{francheasy_id}", response_model=FrancheasyResponse)
 async def get_francheasy_by_id(
+    request: Request,
     francheasy_id: str,
+    # Как и список: кэшируемое тело собирается только из primary
     db: AsyncSession = Depends(get_db),
 ):
-    service = FrancheasyService(db)
-    francheasy = await service.get_francheasy_by_id(francheasy_id)
-    
-    if not francheasy:
-        raise HTTPException(status_code=404, detail="Francheasy not found")
-    
-    francheasy_data = {
-        "id": francheasy.id,
-        "user_id": francheasy.user_id,
-        "title": francheasy.title,
-        "open_store": francheasy.open_store,
-        "start_capital": francheasy.start_capital,
-        "s3_photo_francheasy_keys": francheasy.s3_photo_francheasy_keys,
-        "created_at": francheasy.created_at,
-        "updated_at": francheasy.updated_at,
-    }
     try:
-        keys = francheasy.s3_photo_francheasy_keys or []
-        if keys:
-            francheasy_data["photo_urls"] = [await s3_service.generate_presigned_url(k) for k in keys]
-            francheasy_data["preview_photo_url"] = francheasy_data["photo_urls"][0]
-    except Exception:
-        pass
-    
-    return francheasy_data
+        francheasy_uuid = uuid.UUID(francheasy_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Francheasy not found")
+
+    service = FrancheasyService(db)
+
+    async def build() -> bytes:
+        francheasy = await service.get_francheasy_by_id(francheasy_uuid)
+        
+        if not francheasy:
+            raise HTTPException(status_code=404, detail="Francheasy not found")
+        
+        return FrancheasyResponse.model_validate(await _francheasy_to_dict(francheasy)).model_dump_json().encode()
+
+    key, gen_key = detail_cache_keys(francheasy_uuid)
+    body = await francheasy_cache.get_or_set(key, gen_key, build)
+    etag = body_etag(body)
+    not_modified = conditional_response(request, etag, CATALOG_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return Response(content=body, media_type="application/json", headers=cache_headers(etag, CATALOG_CACHE_CONTROL))
 
 @francheasy_router.put("/{francheasy_id}", response_model=FrancheasyUpdateResponse)
 async def update_francheasy(
@@ -235,14 +283,13 @@ async def add_francheasy_photos(
     if francheasy.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
+    _check_upload_sizes(files)
     added_keys: list[str] = []
     for f in files:
         key = await s3_service.upload_file_get_key(car_id=francheasy_id, file=f, folder="francheasy-photos")
         added_keys.append(key)
 
-    existing = francheasy.s3_photo_francheasy_keys or []
-    francheasy.s3_photo_francheasy_keys = existing + added_keys
-    await db.commit()
+    francheasy = await service.add_francheasy_photos(francheasy_id, added_keys)
 
     all_keys = francheasy.s3_photo_francheasy_keys or []
     photo_urls = []
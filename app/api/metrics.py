@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+
+from app.api.docs import require_docs_access
+from app.db.cache import entity_cache
+from app.db.database import get_pool_stats, get_replica_stats
+from app.services.francheasy import francheasy_cache
+from app.services.s3_service import s3_service
+from app.services.store_clusters import get_store_cluster_stats
+from app.services.store_geo_index import get_store_geo_index_stats
+from app.utils.login_timings import login_timings
+from app.utils.rate_limit import rate_limiter
+from app.utils.user_cache import user_cache
+
+metrics_router = APIRouter()
+
+# Счётчики раскрывают внутреннее устройство и нагрузку, поэтому доступ как у документации
+@metrics_router.get("/metrics", include_in_schema=False, dependencies=[Depends(require_docs_access)])
+async def get_metrics():
+    return {
+        "db_pool": get_pool_stats(),
+        "db_replica": get_replica_stats(),
+        "store_geo_index": get_store_geo_index_stats(),
+        "store_clusters": get_store_cluster_stats(),
+        "user_cache": user_cache.stats(),
+        "rate_limit": rate_limiter.get_stats(),
+        "s3": s3_service.get_stats(),
+        "vk_login": login_timings.get_stats(),
+        "entity_cache": entity_cache.get_stats(),
+        "response_cache": {
+            "francheasy": francheasy_cache.stats.as_dict(),
+        },
+    }
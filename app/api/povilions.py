@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from typing import List
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.models.users import Users
 from app.services.povilions_service import PovilionsService
 from app.schemas.povilions import PovilionsCreate, PovilionsRead, PovilionsUpdate, PovilionsListItem
+from app.utils.http_cache import PRIVATE_CACHE_CONTROL, cache_headers, conditional_response, make_etag
 from app.utils.security import get_current_user
 
 povilions_router = APIRouter()
@@ -32,10 +33,19 @@ async def create_povilion(
 @povilions_router.get("/store/{store_id}", response_model=List[PovilionsListItem])
 async def list_povilions_by_store(
     store_id: UUID,
+    request: Request,
+    response: Response,
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = PovilionsService(db)
+    count, max_updated_at = await service.get_store_povilions_version(store_id)
+    etag = make_etag("povilions-by-store", store_id, count, max_updated_at)
+    not_modified = conditional_response(request, etag, PRIVATE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    response.headers.update(cache_headers(etag, PRIVATE_CACHE_CONTROL))
+
     povilions = await service.get_povilions_by_store(store_id)
     
     result = []
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from typing import List
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.models.users import Users
 from app.services.store_service import StoreService
 from app.services.povilions_service import PovilionsService
-from app.schemas.store import StoreCreate, StoreRead, StoreUpdate, StoreListItem, PovilionListItem
+from app.schemas.store import StoreCreate, StoreRead, StoreUpdate, StoreListItem, StoreNearbyItem, StoreClusters, PovilionListItem
+from app.services.store_clusters import MAX_CLUSTER_TILES
+from app.utils.http_cache import PRIVATE_CACHE_CONTROL, cache_headers, conditional_response, make_etag
 from app.utils.security import get_current_user
+from app.utils.tiles import MAX_ZOOM, tiles_in_bbox
 
 store_router = APIRouter()
 
@@ -24,7 +27,7 @@ async def create_store(
 @store_router.get("/list", response_model=List[StoreListItem])
 async def list_stores(
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = StoreService(db)
     stores = await service.get_all_stores()
@@ -43,13 +46,98 @@ async def list_stores(
         )
     return result    
 
+@store_router.get("/nearby", response_model=List[StoreNearbyItem])
+async def list_nearby_stores(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius: float = Query(5000, gt=0, le=100000, description="Радиус в метрах"),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    service = StoreService(db)
+    stores = await service.get_nearby_stores(lat, lon, radius, limit)
+    
+    return [
+        StoreNearbyItem(
+            store_id=s.store_id,
+            title=s.title,
+            adress=s.adress,
+            cross_country_ability=s.cross_country_ability,
+            latitude=s.latitude,
+            longitude=s.longitude,
+            distance=distance
+        )
+        for s, distance in stores
+    ]
+
+@store_router.get("/bbox", response_model=List[StoreListItem])
+async def list_stores_in_bbox(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    limit: int = Query(500, ge=1, le=2000),
+    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="Invalid bounding box")
+    service = StoreService(db)
+    stores = await service.get_stores_in_bbox(min_lat, min_lon, max_lat, max_lon, limit)
+    
+    return [
+        StoreListItem(
+            store_id=s.store_id,
+            title=s.title,
+            adress=s.adress,
+            cross_country_ability=s.cross_country_ability,
+            latitude=s.latitude,
+            longitude=s.longitude
+        )
+        for s in stores
+    ]
+
+@store_router.get("/clusters", response_model=StoreClusters)
+async def list_store_clusters(
+    bbox: str = Query(..., description="min_lon,min_lat,max_lon,max_lat"),
+    zoom: int = Query(..., ge=0, le=MAX_ZOOM),
+    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid bounding box")
+    if not (-180 <= min_lon <= max_lon <= 180 and -90 <= min_lat <= max_lat <= 90):
+        raise HTTPException(status_code=400, detail="Invalid bounding box")
+
+    tiles = tiles_in_bbox(min_lon, min_lat, max_lon, max_lat, zoom)
+    if len(tiles) > MAX_CLUSTER_TILES:
+        raise HTTPException(status_code=400, detail="Bounding box is too large for this zoom level")
+
+    service = StoreService(db)
+    clusters = await service.get_clusters(zoom, tiles)
+    return StoreClusters(zoom=zoom, clusters=clusters)
+
 @store_router.get("/{store_id}", response_model=StoreRead)
 async def get_store(
     store_id: UUID,
+    request: Request,
+    response: Response,
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = StoreService(db)
+    version = await service.get_store_version(store_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Store not found")
+    etag = make_etag("store", store_id, *version)
+    not_modified = conditional_response(request, etag, PRIVATE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    response.headers.update(cache_headers(etag, PRIVATE_CACHE_CONTROL))
+
     store = await service.get_store_by_id(store_id)
     if not store:
         raise HTTPException(status_code=404, detail="Store not found")
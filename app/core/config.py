@@ -23,6 +23,13 @@ class CompressionType(str, Enum):
     BZIP2 = "bz2"
     ZIP = "zip"
 
+# Ёмкость от 1: при нулевой корзина пуста всегда, а Retry-After выходит бесконечным
+RATE_LIMIT_RULE_PATTERN = r"^[1-9]\d*/\d+(\.\d+)?$"
+
+class StoreGeoBackend(str, Enum):
+    POSTGIS = "postgis"
+    MEMORY = "memory"
+
 class AppSettings(BaseSettings):
     app_name: str = Field(
         ...,
@@ -54,16 +61,47 @@ class DatabaseSettings(BaseSettings):
     postgres_host: str = Field(default="localhost", alias="POSTGRES_HOST")
     postgres_port: int = Field(..., ge=1, le=65535, alias="POSTGRES_PORT")
     debug_sql: bool = Field(default=False)
+    db_pool_size: int = Field(default=10, ge=1, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, ge=0, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(default=30.0, gt=0, alias="DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(default=1800, alias="DB_POOL_RECYCLE")
+    db_pool_pre_ping: bool = Field(default=True, alias="DB_POOL_PRE_PING")
+    db_pool_warmup: int = Field(default=2, ge=0, alias="DB_POOL_WARMUP")
+    postgres_replica_host: Optional[str] = Field(default=None, alias="POSTGRES_REPLICA_HOST")
+    postgres_replica_port: Optional[int] = Field(default=None, ge=1, le=65535, alias="POSTGRES_REPLICA_PORT")
+    db_read_your_writes_seconds: int = Field(default=5, ge=0, alias="DB_READ_YOUR_WRITES_SECONDS")
+    db_replica_max_lag_seconds: float = Field(default=10.0, ge=0, alias="DB_REPLICA_MAX_LAG_SECONDS")
+    db_replica_check_interval: float = Field(default=5.0, gt=0, alias="DB_REPLICA_CHECK_INTERVAL")
 
     @property
     def database_url(self) -> str:
         return f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
+
+    @property
+    def replica_database_url(self) -> Optional[str]:
+        if not self.postgres_replica_host:
+            return None
+        port = self.postgres_replica_port or self.postgres_port
+        return f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}@{self.postgres_replica_host}:{port}/{self.postgres_db}"
     
     model_config = BaseConfig.model_config
     
+class GeoSettings(BaseSettings):
+    store_geo_backend: StoreGeoBackend = Field(default=StoreGeoBackend.POSTGIS, alias="STORE_GEO_BACKEND")
+    store_geo_cell_degrees: float = Field(default=0.05, gt=0, le=10, alias="STORE_GEO_CELL_DEGREES")
+    store_geo_resync_interval: float = Field(default=300.0, ge=0, alias="STORE_GEO_RESYNC_INTERVAL")
+    store_cluster_cache_ttl: float = Field(default=300.0, gt=0, alias="STORE_CLUSTER_CACHE_TTL")
+    store_cluster_cache_size: int = Field(default=4096, ge=1, alias="STORE_CLUSTER_CACHE_SIZE")
+    store_cluster_cache_channel: str = Field(default="store-clusters:invalidate", alias="STORE_CLUSTER_CACHE_CHANNEL")
+
+    model_config = BaseConfig.model_config
+
 class DocsSettings(BaseSettings):
     docs_api_key: str = Field(..., alias="DOCS_API_KEY")
-    
+    # Сессия продлевается при каждом обращении, но живёт не дольше docs_session_max_age
+    docs_session_ttl: int = Field(default=3600, ge=60, alias="DOCS_SESSION_TTL")
+    docs_session_max_age: int = Field(default=86400, ge=60, alias="DOCS_SESSION_MAX_AGE")
+
     model_config = BaseConfig.model_config
 class JWTSettings(BaseSettings):
     secret_key: str = Field(..., min_length=32, alias="SECRET_KEY")
@@ -87,6 +125,30 @@ class VKSettings(BaseSettings):
     vk_client_id: str = Field(..., min_length=1, alias="VK_CLIENT_ID")
     vk_client_secret: str = Field(..., min_length=1, alias="VK_CLIENT_SECRET")
     vk_redirect_uri: HttpUrl = Field(..., alias="VK_REDIRECT_URI")
+    # Сервисный ключ приложения: им фоновое обновление профилей вызывает users.get
+    vk_service_token: Optional[str] = Field(default=None, alias="VK_SERVICE_TOKEN")
+
+    model_config = BaseConfig.model_config
+
+class VKRefreshSettings(BaseSettings):
+    vk_refresh_stale_after_hours: float = Field(default=24.0, gt=0, alias="VK_REFRESH_STALE_AFTER_HOURS")
+    # users.get принимает не больше 1000 id за вызов
+    vk_refresh_chunk_size: int = Field(default=1000, ge=1, le=1000, alias="VK_REFRESH_CHUNK_SIZE")
+    vk_refresh_requests_per_second: float = Field(default=3.0, gt=0, alias="VK_REFRESH_REQUESTS_PER_SECOND")
+
+    model_config = BaseConfig.model_config
+
+class HttpClientSettings(BaseSettings):
+    http_connect_timeout: float = Field(default=3.0, gt=0, alias="HTTP_CONNECT_TIMEOUT")
+    http_read_timeout: float = Field(default=10.0, gt=0, alias="HTTP_READ_TIMEOUT")
+    # Сколько ждать свободного соединения из пула клиента
+    http_pool_timeout: float = Field(default=5.0, gt=0, alias="HTTP_POOL_TIMEOUT")
+    http_max_connections: int = Field(default=100, ge=1, alias="HTTP_MAX_CONNECTIONS")
+    http_max_keepalive_connections: int = Field(default=20, ge=0, alias="HTTP_MAX_KEEPALIVE_CONNECTIONS")
+    http_keepalive_expiry: float = Field(default=30.0, ge=0, alias="HTTP_KEEPALIVE_EXPIRY")
+    http_retries: int = Field(default=2, ge=0, le=5, alias="HTTP_RETRIES")
+    http_retry_backoff: float = Field(default=0.2, gt=0, alias="HTTP_RETRY_BACKOFF")
+    http2_enabled: bool = Field(default=True, alias="HTTP2_ENABLED")
 
     model_config = BaseConfig.model_config
 
@@ -97,6 +159,46 @@ class RedisSettings(BaseSettings):
     redis_user: Optional[str] = Field(default=None, alias="REDIS_USER")
     redis_user_password: Optional[str] = Field(default=None, alias="REDIS_USER_PASSWORD")
     redis_ttl: int = Field(alias="REDIS_TTL")
+    redis_max_connections: int = Field(default=50, ge=1, alias="REDIS_MAX_CONNECTIONS")
+    redis_socket_timeout: float = Field(default=2.0, gt=0, alias="REDIS_SOCKET_TIMEOUT")
+    model_config = BaseConfig.model_config
+
+class UserCacheSettings(BaseSettings):
+    user_cache_enabled: bool = Field(default=True, alias="USER_CACHE_ENABLED")
+    # Сколько секунд процесс может отдавать пользователя без похода в БД, если инвалидация не дошла
+    user_cache_ttl: float = Field(default=60.0, gt=0, alias="USER_CACHE_TTL")
+    user_cache_maxsize: int = Field(default=10000, ge=1, alias="USER_CACHE_MAXSIZE")
+    user_cache_channel: str = Field(default="users:invalidate", alias="USER_CACHE_CHANNEL")
+
+    model_config = BaseConfig.model_config
+
+class EntityCacheSettings(BaseSettings):
+    entity_cache_enabled: bool = Field(default=True, alias="ENTITY_CACHE_ENABLED")
+    entity_cache_l1_size: int = Field(default=10000, ge=1, alias="ENTITY_CACHE_L1_SIZE")
+    entity_cache_ttl: int = Field(default=600, ge=1, alias="ENTITY_CACHE_TTL")
+    # Сколько секунд воркер верит своему поколению таблицы без сверки с Redis (pub/sub обычно быстрее)
+    entity_cache_generation_ttl: float = Field(default=1.0, ge=0, alias="ENTITY_CACHE_GENERATION_TTL")
+    entity_cache_channel: str = Field(default="entity-cache:generations", alias="ENTITY_CACHE_CHANNEL")
+
+    model_config = BaseConfig.model_config
+
+class RateLimitSettings(BaseSettings):
+    rate_limit_enabled: bool = Field(default=True, alias="RATE_LIMIT_ENABLED")
+    # Правила вида "ёмкость/период в секундах": "10/60" — всплеск до 10 запросов, затем 10 в минуту
+    rate_limit_vk_callback: str = Field(default="10/60", pattern=RATE_LIMIT_RULE_PATTERN, alias="RATE_LIMIT_VK_CALLBACK")
+    rate_limit_business_transaction: str = Field(default="30/60", pattern=RATE_LIMIT_RULE_PATTERN, alias="RATE_LIMIT_BUSINESS_TRANSACTION")
+    rate_limit_francheasy_create: str = Field(default="5/60", pattern=RATE_LIMIT_RULE_PATTERN, alias="RATE_LIMIT_FRANCHEASY_CREATE")
+    # Размер локальных корзин на воркер, пока Redis недоступен
+    rate_limit_local_maxsize: int = Field(default=10000, ge=1, alias="RATE_LIMIT_LOCAL_MAXSIZE")
+
+    model_config = BaseConfig.model_config
+
+class ResponseCacheSettings(BaseSettings):
+    response_cache_enabled: bool = Field(default=True, alias="RESPONSE_CACHE_ENABLED")
+    # Ответы содержат presigned-ссылки на фото (живут час), поэтому TTL должен быть заметно меньше
+    response_cache_ttl: int = Field(default=300, ge=1, le=3000, alias="RESPONSE_CACHE_TTL")
+    response_cache_lock_timeout: float = Field(default=5.0, gt=0, alias="RESPONSE_CACHE_LOCK_TIMEOUT")
+
     model_config = BaseConfig.model_config
 
 class MinioSettings(BaseSettings):
@@ -107,7 +209,24 @@ class MinioSettings(BaseSettings):
     minio_port: int = Field(..., ge=1, le=65535, alias="MINIO_PORT")
     minio_endpoint_url: str = Field(..., alias="MINIO_ENDPOINT_URL")
     minio_bucket_name: str = Field(..., min_length=1, alias="MINIO_BUCKET_NAME")
-    
+    # Отдельный пул потоков под S3, чтобы всплеск загрузок не занимал общий executor
+    s3_max_workers: int = Field(default=16, ge=1, alias="S3_MAX_WORKERS")
+    s3_max_upload_concurrency: int = Field(default=8, ge=1, alias="S3_MAX_UPLOAD_CONCURRENCY")
+    s3_max_download_concurrency: int = Field(default=8, ge=1, alias="S3_MAX_DOWNLOAD_CONCURRENCY")
+    # HTTP-соединений botocore к MinIO; не меньше числа потоков, иначе потоки ждут соединение
+    s3_max_pool_connections: int = Field(default=16, ge=1, alias="S3_MAX_POOL_CONNECTIONS")
+    s3_connect_timeout: float = Field(default=3.0, gt=0, alias="S3_CONNECT_TIMEOUT")
+    s3_read_timeout: float = Field(default=30.0, gt=0, alias="S3_READ_TIMEOUT")
+    # Файлы больше порога грузятся multipart-частями; в памяти одновременно одна часть (S3 требует от 5 МБ)
+    s3_multipart_threshold: int = Field(default=8 * 1024 * 1024, ge=5 * 1024 * 1024, alias="S3_MULTIPART_THRESHOLD")
+    s3_multipart_chunksize: int = Field(default=8 * 1024 * 1024, ge=5 * 1024 * 1024, alias="S3_MULTIPART_CHUNKSIZE")
+    # Предел одного сохраняемого объекта. Проверяется уже после того, как Starlette
+    # принял тело во временный файл, поэтому объём принятого он не ограничивает
+    s3_max_upload_size: int = Field(default=25 * 1024 * 1024, ge=1, alias="S3_MAX_UPLOAD_SIZE")
+    # Предел всего multipart-запроса, проверяется до разбора тела (UploadSizeLimitMiddleware).
+    # Перед приложением его стоит продублировать в nginx: client_max_body_size
+    s3_max_upload_request_size: int = Field(default=100 * 1024 * 1024, ge=1, alias="S3_MAX_UPLOAD_REQUEST_SIZE")
+
     model_config = BaseConfig.model_config
 
 class OllamaSettings(BaseSettings):
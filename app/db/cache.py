@@ -0,0 +1,346 @@
+import asyncio
+import copy
+import functools
+import json
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from cachetools import TTLCache
+from loguru import logger
+from redis.exceptions import RedisError
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+
+from app.core.config import EntityCacheSettings
+from app.db.redis import get_pubsub_redis, get_redis
+
+
+class TableCacheStats:
+    def __init__(self):
+        self.hits_l1 = 0
+        self.hits_l2 = 0
+        self.misses = 0
+        self.errors = 0
+        self.entries_stored = 0
+        self.entry_bytes_total = 0
+        self.entry_bytes_max = 0
+
+    def record_entry(self, size: int):
+        self.entries_stored += 1
+        self.entry_bytes_total += size
+        if size > self.entry_bytes_max:
+            self.entry_bytes_max = size
+
+    def as_dict(self) -> dict:
+        lookups = self.hits_l1 + self.hits_l2 + self.misses
+        return {
+            "hits_l1": self.hits_l1,
+            "hits_l2": self.hits_l2,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round((self.hits_l1 + self.hits_l2) / lookups, 4) if lookups else 0.0,
+            "l1_hit_ratio": round(self.hits_l1 / lookups, 4) if lookups else 0.0,
+            "entries_stored": self.entries_stored,
+            "entry_bytes_avg": round(self.entry_bytes_total / self.entries_stored) if self.entries_stored else 0,
+            "entry_bytes_max": self.entry_bytes_max,
+        }
+
+
+def _json_default(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+# Во что превращать обратно строки из JSON по python_type колонки
+_DECODERS = {
+    uuid.UUID: uuid.UUID,
+    datetime: datetime.fromisoformat,
+    date: date.fromisoformat,
+    Decimal: Decimal,
+}
+
+
+class RowCodec:
+    """JSON-представление значений колонок модели для L2.
+
+    Не pickle: любой, кто может писать в Redis, иначе выполнил бы код в воркерах.
+    """
+
+    def __init__(self, mapper):
+        self._decoders: Dict[str, Callable[[Any], Any]] = {}
+        for attr in mapper.column_attrs:
+            try:
+                python_type = attr.columns[0].type.python_type
+            except NotImplementedError:
+                continue
+            decoder = _DECODERS.get(python_type)
+            if decoder is not None:
+                self._decoders[attr.key] = decoder
+
+    def dumps(self, values: dict) -> bytes:
+        return json.dumps(values, default=_json_default, separators=(",", ":")).encode()
+
+    def loads(self, raw: bytes) -> dict:
+        values = json.loads(raw)
+        if not isinstance(values, dict):
+            raise ValueError("entity cache entry is not an object")
+        for key, decoder in self._decoders.items():
+            if values.get(key) is not None:
+                values[key] = decoder(values[key])
+        return values
+
+
+class EntityCache:
+    """Двухуровневый кэш строк по первичному ключу: L1 — LRU в памяти воркера,
+    L2 — Redis, общий для всех воркеров.
+
+    У каждой таблицы есть поколение (счётчик в Redis), которое запись
+    увеличивает после commit. Поколение входит в ключ L2 и хранится рядом с
+    записью L1, поэтому после bump старые записи просто перестают находиться.
+    Строка, прочитанная до bump, сохраняется под старым поколением и тоже
+    никому не достанется. Новые поколения рассылаются через pub/sub;
+    без подписки воркер сверяет поколение с Redis при каждом обращении.
+    """
+
+    RECONNECT_DELAY = 1.0
+    MAX_RECONNECT_DELAY = 30.0
+
+    def __init__(self, settings: EntityCacheSettings):
+        self.settings = settings
+        self._l1: TTLCache = TTLCache(maxsize=settings.entity_cache_l1_size, ttl=settings.entity_cache_ttl)
+        self._generations: Dict[str, Tuple[int, float]] = {}
+        self._subscribed = False
+        self.stats: Dict[str, TableCacheStats] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.entity_cache_enabled
+
+    def _table_stats(self, table: str) -> TableCacheStats:
+        stats = self.stats.get(table)
+        if stats is None:
+            stats = self.stats[table] = TableCacheStats()
+        return stats
+
+    @staticmethod
+    def _gen_key(table: str) -> str:
+        return f"entity-cache:gen:{table}"
+
+    @staticmethod
+    def _entry_key(table: str, generation: int, key: str) -> str:
+        return f"entity-cache:{table}:{generation}:{key}"
+
+    def _set_generation(self, table: str, generation: int):
+        current = self._generations.get(table)
+        # Поколение только растёт: запоздавшее сообщение не откатывает его назад
+        if current is None or generation >= current[0]:
+            self._generations[table] = (generation, time.monotonic())
+
+    async def generation(self, table: str) -> int:
+        current = self._generations.get(table)
+        if (
+            current is not None
+            and self._subscribed
+            and time.monotonic() - current[1] < self.settings.entity_cache_generation_ttl
+        ):
+            return current[0]
+        generation = int(await get_redis().get(self._gen_key(table)) or 0)
+        self._set_generation(table, generation)
+        return max(generation, self._generations[table][0])
+
+    async def get(
+        self,
+        table: str,
+        key: str,
+        load: Callable[[], Awaitable[Optional[dict]]],
+        codec: RowCodec,
+        store: bool = True,
+    ) -> Optional[dict]:
+        """Значения колонок строки: из L1, из L2 или из load() с сохранением в оба уровня."""
+        stats = self._table_stats(table)
+        try:
+            generation = await self.generation(table)
+        except RedisError as e:
+            stats.errors += 1
+            logger.warning(f"Entity cache unavailable for {table}: {e}")
+            return await load()
+
+        entry = self._l1.get((table, key))
+        if entry is not None and entry[0] == generation:
+            stats.hits_l1 += 1
+            return entry[1]
+
+        redis_key = self._entry_key(table, generation, key)
+        try:
+            raw = await get_redis().get(redis_key)
+        except RedisError as e:
+            stats.errors += 1
+            logger.warning(f"Entity cache L2 read failed for {redis_key}: {e}")
+            raw = None
+        if raw is not None:
+            try:
+                values = codec.loads(raw)
+            except (TypeError, ValueError) as e:
+                # Битая запись считается промахом и перезаписывается ниже
+                stats.errors += 1
+                logger.warning(f"Entity cache entry {redis_key} is malformed: {e}")
+            else:
+                self._l1[(table, key)] = (generation, values)
+                stats.hits_l2 += 1
+                return values
+
+        stats.misses += 1
+        values = await load()
+        if values is None or not store:
+            return values
+
+        try:
+            raw = codec.dumps(values)
+        except (TypeError, ValueError) as e:
+            stats.errors += 1
+            logger.warning(f"Entity cache cannot serialize {table}:{key}: {e}")
+            return values
+        stats.record_entry(len(raw))
+        self._l1[(table, key)] = (generation, values)
+        try:
+            await get_redis().set(redis_key, raw, ex=self.settings.entity_cache_ttl)
+        except RedisError as e:
+            stats.errors += 1
+            logger.warning(f"Entity cache L2 write failed for {redis_key}: {e}")
+        return values
+
+    async def bump(self, *tables: str):
+        """Вызывается после commit, изменившего строки таблиц."""
+        if not self.enabled:
+            return
+        redis = get_redis()
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for table in tables:
+                    pipe.incr(self._gen_key(table))
+                generations = await pipe.execute()
+            for table, generation in zip(tables, generations):
+                self._set_generation(table, generation)
+            await redis.publish(
+                self.settings.entity_cache_channel,
+                ",".join(f"{table}:{generation}" for table, generation in zip(tables, generations)),
+            )
+        except RedisError as e:
+            # Поколение не сдвинулось: свой L1 чистим, остальные воркеры увидят изменения по TTL
+            for key in [key for key in self._l1 if key[0] in tables]:
+                self._l1.pop(key, None)
+            logger.error(f"Entity cache invalidation failed for {tables}: {e}")
+
+    async def listen(self):
+        delay = self.RECONNECT_DELAY
+        while True:
+            pubsub = get_pubsub_redis().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.settings.entity_cache_channel)
+                # Поколения, полученные до подписки, могли пропустить bump
+                self._generations.clear()
+                self._subscribed = True
+                delay = self.RECONNECT_DELAY
+                async for message in pubsub.listen():
+                    for item in message["data"].decode().split(","):
+                        table, _, generation = item.rpartition(":")
+                        if table and generation.isdigit():
+                            self._set_generation(table, int(generation))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Entity cache listener failed, retrying in {delay:.0f}s: {e}")
+                self._subscribed = False
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+            finally:
+                self._subscribed = False
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "l1_size": len(self._l1),
+            "subscribed": self._subscribed,
+            "tables": {table: stats.as_dict() for table, stats in self.stats.items()},
+        }
+
+
+entity_cache = EntityCache(EntityCacheSettings())
+
+def start_entity_cache_listener() -> Optional[asyncio.Task]:
+    if not entity_cache.enabled:
+        return None
+    return asyncio.create_task(entity_cache.listen())
+
+async def invalidate(*models):
+    await entity_cache.bump(*(model.__tablename__ for model in models))
+
+
+def _column_values(instance) -> dict:
+    state = inspect(instance)
+    # Только загруженные колонки: отложенные (deferred) останутся ленивыми и после кэша
+    return {attr.key: state.dict[attr.key] for attr in state.mapper.column_attrs if attr.key in state.dict}
+
+def _detached_instance(model, values: dict):
+    # Копия: JSON-колонки изменяемы, а словарь из L1 общий для всех запросов воркера
+    instance = model(**copy.deepcopy(values))
+    make_transient_to_detached(instance)
+    return instance
+
+
+def cached(model):
+    """Кэширует метод сервиса вида get_x_by_id(self, pk) через entity_cache.
+
+    Сначала смотрит identity map сессии self.db, затем L1/L2, и только потом
+    вызывает сам метод. Найденное в кэше добавляется в сессию через
+    merge(load=False) без запроса в БД. Сессии реплики кэш читают, но не
+    наполняют: реплика может отставать от уже сдвинутого поколения.
+    """
+    mapper = inspect(model)
+    table = model.__tablename__
+    pk_type = mapper.primary_key[0].type.python_type
+    deferred_keys = {attr.key for attr in mapper.column_attrs if attr.deferred}
+    codec = RowCodec(mapper)
+
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, key, *args, **kwargs):
+            if not entity_cache.enabled or args or kwargs:
+                return await method(self, key, *args, **kwargs)
+            try:
+                pk = key if isinstance(key, pk_type) else pk_type(str(key))
+            except (TypeError, ValueError):
+                return await method(self, key)
+
+            session = self.db
+            existing = session.identity_map.get(identity_key(model, pk))
+            # Объект с просроченными колонками отдавать нельзя: их ленивая загрузка в async невозможна
+            if existing is not None and not inspect(existing).expired_attributes - deferred_keys:
+                return existing
+
+            loaded: Dict[str, Any] = {}
+
+            async def load():
+                instance = loaded["instance"] = await method(self, pk)
+                return _column_values(instance) if instance is not None else None
+
+            values = await entity_cache.get(table, str(pk), load, codec, store=not session.info.get("replica"))
+            if "instance" in loaded:
+                return loaded["instance"]
+            if values is None:
+                return None
+            return await session.merge(_detached_instance(model, values), load=False)
+        return wrapper
+    return decorator
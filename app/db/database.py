@@ -1,44 +1,337 @@
-from sqlalchemy import MetaData
+import asyncio
+import time
+from typing import Optional
+
+from fastapi import Depends, Request
+import jwt
+from loguru import logger
+from redis.exceptions import RedisError
+from sqlalchemy import MetaData, event, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base
-from sqlalchemy.pool import NullPool  # ← важно для Celery
+from sqlalchemy.orm import Session, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool  # ← NullPool важно для Celery
+from starlette.datastructures import MutableHeaders
 
-from app.core.config import DatabaseSettings
+from app.core.config import DatabaseSettings, JWTSettings
+from app.db.redis import get_redis
 
 Base = declarative_base()
 
 class BaseModel(Base):
     __abstract__ = True
 
+
+PRIMARY_STICKY_COOKIE = "db_primary_until"
+# Та же метка для клиентов с Bearer-токеном, которые не хранят cookie (мобильные, API)
+PRIMARY_STICKY_USER_KEY = "db:primary-until:user:{user_id}"
+
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+class PoolStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float):
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        if seconds > self.wait_seconds_max:
+            self.wait_seconds_max = seconds
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Пул веб-процесса, замеряющий время ожидания свободного соединения."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.stats.record_wait(time.perf_counter() - started)
+
+
+class ReplicaHealth:
+    def __init__(self):
+        self.healthy = True
+        self.lag_seconds = None
+        self.checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def is_usable(self, engine, db_settings: DatabaseSettings) -> bool:
+        if time.monotonic() - self.checked_at < db_settings.db_replica_check_interval:
+            return self.healthy
+        async with self._lock:
+            if time.monotonic() - self.checked_at < db_settings.db_replica_check_interval:
+                return self.healthy
+            try:
+                async with engine.connect() as connection:
+                    result = await asyncio.wait_for(connection.execute(REPLICA_LAG_QUERY), timeout=2)
+                    self.lag_seconds = float(result.scalar() or 0)
+                self.healthy = self.lag_seconds <= db_settings.db_replica_max_lag_seconds
+                if not self.healthy:
+                    logger.warning(f"Read replica lags {self.lag_seconds:.1f}s, reading from primary")
+            except Exception as e:
+                self.healthy = False
+                self.lag_seconds = None
+                logger.warning(f"Read replica is unavailable, reading from primary: {e}")
+            self.checked_at = time.monotonic()
+        return self.healthy
+
+
+replica_health = ReplicaHealth()
+
+_db_settings = None
 _engine = None
 _AsyncSessionLocal = None
+_replica_engine = None
+_ReplicaSessionLocal = None
+_worker_engine = None
+_WorkerSessionLocal = None
+
+def get_db_settings() -> DatabaseSettings:
+    global _db_settings
+    if _db_settings is None:
+        _db_settings = DatabaseSettings()
+    return _db_settings
+
+def _create_pooled_engine(url: str):
+    db_settings = get_db_settings()
+    return create_async_engine(
+        url,
+        future=True,
+        echo=db_settings.debug_sql,
+        poolclass=InstrumentedQueuePool,
+        pool_size=db_settings.db_pool_size,
+        max_overflow=db_settings.db_max_overflow,
+        pool_timeout=db_settings.db_pool_timeout,
+        pool_recycle=db_settings.db_pool_recycle,
+        pool_pre_ping=db_settings.db_pool_pre_ping,
+    )
 
 def get_engine():
     global _engine
     if _engine is None:
-        db_settings = DatabaseSettings()
-        _engine = create_async_engine(
+        _engine = _create_pooled_engine(get_db_settings().database_url)
+    return _engine
+
+def get_replica_engine():
+    global _replica_engine
+    if _replica_engine is None:
+        replica_url = get_db_settings().replica_database_url
+        if replica_url:
+            _replica_engine = _create_pooled_engine(replica_url)
+    return _replica_engine
+
+def get_worker_engine():
+    global _worker_engine
+    if _worker_engine is None:
+        db_settings = get_db_settings()
+        _worker_engine = create_async_engine(
             db_settings.database_url,
             future=True,
-            poolclass=NullPool,  
+            echo=db_settings.debug_sql,
+            poolclass=NullPool,
         )
-    return _engine
+    return _worker_engine
+
+def _create_sessionmaker(engine):
+    return async_sessionmaker(
+        bind=engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+    )
 
 def get_async_sessionmaker():
     global _AsyncSessionLocal
     if _AsyncSessionLocal is None:
-        _AsyncSessionLocal = async_sessionmaker(
-            bind=get_engine(),
-            class_=AsyncSession,
-            expire_on_commit=False,
-            autoflush=False,
-        )
+        _AsyncSessionLocal = _create_sessionmaker(get_engine())
     return _AsyncSessionLocal
 
+def get_replica_sessionmaker():
+    global _ReplicaSessionLocal
+    if _ReplicaSessionLocal is None:
+        _ReplicaSessionLocal = _create_sessionmaker(get_replica_engine())
+    return _ReplicaSessionLocal
+
+def get_worker_sessionmaker():
+    global _WorkerSessionLocal
+    if _WorkerSessionLocal is None:
+        _WorkerSessionLocal = _create_sessionmaker(get_worker_engine())
+    return _WorkerSessionLocal
+
+async def _warmup(engine, count: int):
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(await engine.connect())
+    finally:
+        for connection in connections:
+            await connection.close()
+
+async def warmup_engine():
+    db_settings = get_db_settings()
+    count = min(db_settings.db_pool_warmup, db_settings.db_pool_size)
+    await _warmup(get_engine(), count)
+    replica_engine = get_replica_engine()
+    if replica_engine is not None:
+        await _warmup(replica_engine, count)
+
+async def dispose_engines():
+    global _engine, _AsyncSessionLocal, _replica_engine, _ReplicaSessionLocal, _worker_engine, _WorkerSessionLocal
+    for engine in (_engine, _replica_engine, _worker_engine):
+        if engine is not None:
+            await engine.dispose()
+    _engine = _AsyncSessionLocal = None
+    _replica_engine = _ReplicaSessionLocal = None
+    _worker_engine = _WorkerSessionLocal = None
+
+def _engine_pool_stats(engine) -> dict:
+    if engine is None:
+        return {}
+    pool = engine.sync_engine.pool
+    stats = pool.stats
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": stats.checkouts,
+        "wait_seconds_total": round(stats.wait_seconds_total, 6),
+        "wait_seconds_max": round(stats.wait_seconds_max, 6),
+        "wait_seconds_avg": round(stats.wait_seconds_total / stats.checkouts, 6) if stats.checkouts else 0.0,
+    }
+
+def get_pool_stats() -> dict:
+    return _engine_pool_stats(_engine)
+
+def get_replica_stats() -> dict:
+    if _replica_engine is None:
+        return {}
+    return {
+        "pool": _engine_pool_stats(_replica_engine),
+        "healthy": replica_health.healthy,
+        "lag_seconds": replica_health.lag_seconds,
+    }
+
+@event.listens_for(Session, "after_commit")
+def _mark_primary_write(session):
+    request = session.info.get("request")
+    if request is not None:
+        request.state.db_wrote = True
+
+_jwt_settings = None
+
+def _bearer_user_id(request: Request) -> Optional[str]:
+    """id пользователя запроса: из get_current_user, если он уже отработал, иначе из access-токена."""
+    user_id = getattr(request.state, "user_id", None)
+    if user_id is not None:
+        return str(user_id)
+    token = request.headers.get("authorization")
+    if not token:
+        return None
+    global _jwt_settings
+    if _jwt_settings is None:
+        _jwt_settings = JWTSettings()
+    try:
+        payload = jwt.decode(token.removeprefix("Bearer "), _jwt_settings.secret_key, algorithms=[_jwt_settings.algorithm])
+    except jwt.InvalidTokenError:
+        return None
+    if payload.get("type") != "access" or payload.get("id") is None:
+        return None
+    return str(payload["id"])
+
+async def _sticks_to_primary(request: Request) -> bool:
+    sticky_until = request.cookies.get(PRIMARY_STICKY_COOKIE)
+    if sticky_until:
+        try:
+            if int(sticky_until) > time.time():
+                return True
+        except ValueError:
+            pass
+    user_id = _bearer_user_id(request)
+    if user_id is None:
+        return False
+    try:
+        return bool(await get_redis().exists(PRIMARY_STICKY_USER_KEY.format(user_id=user_id)))
+    except RedisError as e:
+        logger.warning(f"Read-your-writes marker check failed, reading from replica: {e}")
+        return False
+
+
+async def _mark_user_primary(user_id, window: int):
+    try:
+        await get_redis().set(PRIMARY_STICKY_USER_KEY.format(user_id=user_id), 1, ex=window)
+    except RedisError as e:
+        logger.warning(f"Failed to set read-your-writes marker for user {user_id}: {e}")
+
+
+class ReadYourWritesMiddleware:
+    """После записи в primary на короткое окно направляет чтения этого клиента
+    в primary вместо реплики.
+
+    Метка ставится двумя способами: cookie для браузеров и ключ в Redis по id
+    пользователя для клиентов с Bearer-токеном. Анонимный клиент без cookie
+    гарантии не получает.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            state = scope.get("state", {})
+            if message["type"] == "http.response.start" and state.get("db_wrote"):
+                window = get_db_settings().db_read_your_writes_seconds
+                if window:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "set-cookie",
+                        f"{PRIMARY_STICKY_COOKIE}={int(time.time()) + window}; Max-Age={window}; Path=/; HttpOnly; SameSite=lax",
+                    )
+                    # До отправки ответа: следующий запрос клиента уже увидит метку
+                    if state.get("user_id") is not None:
+                        await _mark_user_primary(state["user_id"], window)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
 def get_db_session():
     """Используется в Celery-задачах"""
-    return get_async_sessionmaker()()
+    return get_worker_sessionmaker()()
 
-async def get_db() -> AsyncSession:
+async def get_db(request: Request) -> AsyncSession:
     async with get_async_sessionmaker()() as session:
-        yield session
\ No newline at end of file
+        session.info["request"] = request
+        yield session
+
+async def get_read_db(request: Request, db: AsyncSession = Depends(get_db)) -> AsyncSession:
+    replica_engine = get_replica_engine()
+    if (
+        replica_engine is None
+        or await _sticks_to_primary(request)
+        or not await replica_health.is_usable(replica_engine, get_db_settings())
+    ):
+        yield db
+        return
+    async with get_replica_sessionmaker()() as session:
+        # Реплика может отставать, поэтому прочитанное из неё не кладём в кэш сущностей
+        session.info["replica"] = True
+        yield session
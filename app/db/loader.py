@@ -0,0 +1,80 @@
+import asyncio
+from typing import Any, Dict, List
+
+from sqlalchemy import any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class BatchLoader:
+    """Собирает вызовы load(), сделанные в одном тике event loop, в один запрос
+    WHERE key = ANY(:keys) и запоминает результаты на время жизни сессии (запроса)."""
+
+    def __init__(self, session: AsyncSession, model, key_column):
+        self.session = session
+        self.model = model
+        self.key_column = key_column
+        self._results: Dict[Any, asyncio.Future] = {}
+        self._pending: List[Any] = []
+
+    async def load(self, key):
+        future = self._results.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._results[key] = future
+            self._pending.append(key)
+            # Отдаём управление, чтобы соседние корутины успели добавить свои ключи в пачку
+            await asyncio.sleep(0)
+            if self._pending:
+                await self._dispatch()
+        return await future
+
+    async def load_many(self, keys: List[Any]) -> List[Any]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key, value):
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._results[key] = future
+
+    def clear(self, key):
+        self._results.pop(key, None)
+
+    async def _dispatch(self):
+        keys, self._pending = self._pending, []
+        try:
+            async with _get_session_lock(self.session):
+                result = await self.session.execute(
+                    select(self.model).where(
+                        self.key_column == any_(bindparam("keys", keys, type_=ARRAY(self.key_column.type)))
+                    )
+                )
+                rows = {getattr(row, self.key_column.key): row for row in result.scalars().all()}
+        except Exception as e:
+            for key in keys:
+                future = self._results.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+
+        for key in keys:
+            future = self._results.get(key)
+            if future is not None and not future.done():
+                future.set_result(rows.get(key))
+
+
+def _get_session_lock(session: AsyncSession) -> asyncio.Lock:
+    # AsyncSession не допускает параллельных запросов, поэтому пачки разных
+    # загрузчиков одной сессии выполняются по очереди.
+    lock = session.info.get("loader_lock")
+    if lock is None:
+        lock = session.info["loader_lock"] = asyncio.Lock()
+    return lock
+
+
+def get_loader(session: AsyncSession, model, key_column) -> BatchLoader:
+    loaders = session.info.setdefault("loaders", {})
+    loader = loaders.get(model)
+    if loader is None:
+        loader = loaders[model] = BatchLoader(session, model, key_column)
+    return loader
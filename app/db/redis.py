@@ -0,0 +1,64 @@
+from typing import Optional
+
+from redis import asyncio as aioredis
+
+from app.core.config import RedisSettings
+
+# Как часто подписка проверяет соединение PING-ом, раз таймаута чтения у неё нет
+PUBSUB_HEALTH_CHECK_INTERVAL = 30
+
+_redis: Optional[aioredis.Redis] = None
+_pubsub_redis: Optional[aioredis.Redis] = None
+
+def _redis_params(redis_settings: RedisSettings) -> dict:
+    redis_params = {
+        'host': redis_settings.redis_network_name,
+        'port': redis_settings.redis_port,
+        'socket_connect_timeout': redis_settings.redis_socket_timeout,
+    }
+
+    if redis_settings.redis_password:
+        redis_params['password'] = redis_settings.redis_password
+
+    if redis_settings.redis_user and redis_settings.redis_user_password:
+        redis_params['username'] = redis_settings.redis_user
+        redis_params['password'] = redis_settings.redis_user_password
+    return redis_params
+
+def get_redis() -> aioredis.Redis:
+    """Общий асинхронный клиент Redis процесса (один пул соединений на всех)."""
+    global _redis
+    if _redis is None:
+        redis_settings = RedisSettings()
+        _redis = aioredis.Redis(connection_pool=aioredis.BlockingConnectionPool(
+            **_redis_params(redis_settings),
+            max_connections=redis_settings.redis_max_connections,
+            socket_timeout=redis_settings.redis_socket_timeout,
+            # Сколько ждать свободного соединения из пула
+            timeout=redis_settings.redis_socket_timeout,
+        ))
+    return _redis
+
+def get_pubsub_redis() -> aioredis.Redis:
+    """Клиент для подписок pub/sub.
+
+    Подписка может молчать сколько угодно, поэтому socket_timeout у неё нет:
+    с таймаутом общего пула тихий канал падал бы с TimeoutError каждые
+    несколько секунд. Обрыв соединения ловит health check.
+    """
+    global _pubsub_redis
+    if _pubsub_redis is None:
+        _pubsub_redis = aioredis.Redis(
+            **_redis_params(RedisSettings()),
+            socket_timeout=None,
+            health_check_interval=PUBSUB_HEALTH_CHECK_INTERVAL,
+        )
+    return _pubsub_redis
+
+async def close_redis():
+    global _redis, _pubsub_redis
+    for client in (_redis, _pubsub_redis):
+        if client is not None:
+            await client.aclose()
+            await client.connection_pool.disconnect()
+    _redis = _pubsub_redis = None
@@ -1,11 +1,24 @@
 import os
 import sys
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 import uvicorn
 from app.core.config import AppSettings
 from loguru import logger
 from app.api.auth import auth_router
 from app.api.docs import docs_router
+from app.api.metrics import metrics_router
+from app.db.cache import start_entity_cache_listener
+from app.db.database import ReadYourWritesMiddleware, dispose_engines, warmup_engine
+from app.db.redis import close_redis, get_redis
+from app.services.s3_service import UploadTooLargeError, minio_settings, s3_service
+from app.services.store_clusters import start_store_cluster_listener
+from app.services.store_geo_index import start_store_geo_index
+from app.utils.http_client import close_http_client, get_http_client
+from app.utils.openapi_cache import openapi_cache
+from app.utils.upload_limit import UploadSizeLimitMiddleware
+from app.utils.user_cache import start_user_cache_listener
 
 sys.path.append('/app')
 
@@ -34,6 +47,32 @@ def setup_logging():
         compression=settings.log_compression.value,
         format=settings.log_format,
     )
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await warmup_engine()
+    except Exception as e:
+        logger.warning(f"Database pool warm-up failed: {e}")
+    try:
+        # Пул создаётся здесь, а не на первом логине; недоступный Redis виден сразу в логе
+        await get_redis().ping()
+    except Exception as e:
+        logger.warning(f"Redis is unavailable at startup: {e}")
+    get_http_client()
+    try:
+        openapi_cache.warm(app)
+    except Exception as e:
+        logger.warning(f"OpenAPI schema pre-build failed: {e}")
+    background_tasks = [await start_store_geo_index(), start_user_cache_listener(), start_entity_cache_listener(), start_store_cluster_listener()]
+    yield
+    for task in background_tasks:
+        if task is not None:
+            task.cancel()
+    await close_http_client()
+    s3_service.close()
+    await close_redis()
+    await dispose_engines()
+
 def create_app():
     settings = get_app_settings() 
     app = FastAPI(
@@ -42,9 +81,16 @@ def create_app():
         version="1.0.0",
         docs_url=None,  
         redoc_url=None,
-        openapi_url=None  
+        openapi_url=None,
+        lifespan=lifespan,
     )
     setup_logging()
+    app.add_middleware(ReadYourWritesMiddleware)
+    app.add_middleware(UploadSizeLimitMiddleware, max_size=minio_settings.s3_max_upload_request_size)
+
+    @app.exception_handler(UploadTooLargeError)
+    async def upload_too_large_handler(request: Request, exc: UploadTooLargeError):
+        return JSONResponse({"detail": str(exc)}, status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
     
     @app.get("/")
     def read_root():
@@ -54,6 +100,7 @@ def create_app():
         return {"status": "ok"}
     app.include_router(auth_router, prefix="/auth")
     app.include_router(docs_router)
+    app.include_router(metrics_router)
     
     return app
 
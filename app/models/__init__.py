@@ -3,7 +3,8 @@ from .francheasy import Francheasy
 from .store import Store
 from .povilions import Povilions
 from .business import Business
+from .business_transaction import BusinessTransaction
 from .business_request import BusinessRequest
 
-__all__ = ["Users", "Francheasy", "Store", "Povilions", "Business", "BusinessRequest"]
+__all__ = ["Users", "Francheasy", "Store", "Povilions", "Business", "BusinessTransaction", "BusinessRequest"]
 
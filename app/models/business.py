@@ -1,7 +1,7 @@
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 import uuid
-from sqlalchemy import Column, ForeignKey, String, DateTime, func, JSON
+from sqlalchemy import Column, ForeignKey, String, DateTime, Float, Integer, func
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 
@@ -15,12 +15,15 @@ class Business(Base):
     store_id = Column(UUID(as_uuid=True), ForeignKey("stores.store_id"), nullable=True)
     povilion_id = Column(UUID(as_uuid=True), ForeignKey("povilions.povilion_id"), nullable=True)
     
-    transactions = Column(JSON, default=[])
+    total_income = Column(Float, nullable=False, default=0.0, server_default="0")
+    total_expense = Column(Float, nullable=False, default=0.0, server_default="0")
+    transaction_count = Column(Integer, nullable=False, default=0, server_default="0")
     
     user = relationship("Users", back_populates="businesses")
     francheasy = relationship("Francheasy", back_populates="businesses")
     store = relationship("Store", back_populates="businesses")
     povilion = relationship("Povilions", back_populates="business")
+    transactions = relationship("BusinessTransaction", back_populates="business", passive_deletes=True)
     
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
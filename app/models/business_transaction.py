@@ -0,0 +1,21 @@
+from sqlalchemy.orm import relationship
+from app.db.database import Base
+import uuid
+from sqlalchemy import Column, ForeignKey, String, DateTime, Float, Index, func
+from sqlalchemy.dialects.postgresql import UUID
+
+
+class BusinessTransaction(Base):
+    __tablename__ = "business_transactions"
+    __table_args__ = (
+        Index("ix_business_transactions_business_id_date", "business_id", "date"),
+    )
+
+    transaction_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    business_id = Column(UUID(as_uuid=True), ForeignKey("business.business_id", ondelete="CASCADE"), nullable=False)
+    type = Column(String, nullable=False)
+    amount = Column(Float, nullable=False)
+    description = Column(String, nullable=True)
+    date = Column(DateTime, server_default=func.now(), nullable=False)
+
+    business = relationship("Business", back_populates="transactions")
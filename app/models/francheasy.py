@@ -1,18 +1,28 @@
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from app.db.database import Base
 import uuid
-from sqlalchemy import Boolean, Column,Float, DateTime, ForeignKey, Integer,JSON, String, Text, func
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy import Boolean, Column, Computed, Float, DateTime, ForeignKey, Index, Integer,JSON, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
 from datetime import datetime
 
 class Francheasy(Base):
     __tablename__ = "francheasy"
+    __table_args__ = (
+        Index("ix_francheasy_created_at_id", "created_at", "id"),
+        Index("ix_francheasy_ebitda_id", "ebitda", "id"),
+        Index("ix_francheasy_start_capital_id", "start_capital", "id"),
+        Index("ix_francheasy_open_store_id", "open_store", "id"),
+        Index("ix_francheasy_payback_period_id", "payback_period", "id"),
+        Index("ix_francheasy_title_tsv", "title_tsv", postgresql_using="gin"),
+    )
     title = Column(String)
+    title_tsv = deferred(Column(TSVECTOR, Computed("to_tsvector('russian', coalesce(title, ''))", persisted=True)))
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     ebitda = Column(Float,nullable=False)
     start_capital = Column(Float,nullable=False)
     open_store = Column(Float,nullable=False)
+    payback_period = Column(Float, Computed("CASE WHEN ebitda > 0 THEN start_capital / ebitda END", persisted=True))
     phone_number = Column(String,nullable=False)
     s3_photo_francheasy_keys = Column(JSON, default=[])
     
@@ -1,19 +1,33 @@
-from sqlalchemy.orm import relationship
+from geoalchemy2 import Geography
+from sqlalchemy.orm import deferred, relationship
 from app.db.database import Base
 import uuid
-from sqlalchemy import  Column, ForeignKey,String, Text,DateTime,Float, func
+from sqlalchemy import  Column, Computed, ForeignKey, Index, String, Text,DateTime,Float, func
 from sqlalchemy.dialects.postgresql import JSONB, UUID,ARRAY
 from datetime import datetime
 from sqlalchemy.ext.declarative import declarative_base
+from app.core.config import GeoSettings, StoreGeoBackend
+
+# Без PostGIS миграция f3c71a9e2d58 колонку location не создаёт, поэтому
+# и в маппере её нет: иначе INSERT ... RETURNING location падает
+USES_POSTGIS = GeoSettings().store_geo_backend == StoreGeoBackend.POSTGIS
 
 class Store(Base):
     __tablename__ = "stores"
+    __table_args__ = (
+        Index("ix_stores_latitude_longitude", "latitude", "longitude"),
+    ) + ((Index("ix_stores_location", "location", postgresql_using="gist"),) if USES_POSTGIS else ())
     store_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     title = Column(String,nullable=False)
     cross_country_ability = Column(Float, nullable=False)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    if USES_POSTGIS:
+        location = deferred(Column(
+            Geography(geometry_type="POINT", srid=4326, spatial_index=False),
+            Computed("ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography", persisted=True),
+        ))
     adress = Column(String,nullable=True)
     
     user = relationship("Users", back_populates="stores")
@@ -50,11 +50,15 @@ class BusinessRead(BusinessBase):
 class BusinessListItem(BaseModel):
     business_id: UUID
     francheasy_id: UUID
+    francheasy_title: Optional[str] = None
     store_id: Optional[UUID] = None
+    store_address: Optional[str] = None
     povilion_id: Optional[UUID] = None
+    povilion_title: Optional[str] = None
     total_income: float = 0.0
     total_expense: float = 0.0
     balance: float = 0.0
+    profit_percentage: float = 0.0
     
     class Config:
         from_attributes = True
@@ -2,6 +2,20 @@ from pydantic import BaseModel, Field
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
+from enum import Enum
+
+
+class FrancheasySort(str, Enum):
+    CREATED_AT = "created_at"
+    EBITDA = "ebitda"
+    START_CAPITAL = "start_capital"
+    OPEN_STORE = "open_store"
+    PAYBACK_PERIOD = "payback_period"
+
+
+class SortOrder(str, Enum):
+    ASC = "asc"
+    DESC = "desc"
 
 
 class FrancheasyCreate(BaseModel):
@@ -36,8 +50,10 @@ class FrancheasyResponse(BaseModel):
     id: UUID
     user_id: UUID
     title: Optional[str] = None
+    ebitda: Optional[float] = None
     open_store: Optional[float] = None
     start_capital: Optional[float] = None
+    payback_period: Optional[float] = None
     s3_photo_francheasy_keys: Optional[List[str]] = None
     photo_urls: Optional[List[str]] = None
     preview_photo_url: Optional[str] = None
@@ -46,3 +62,19 @@ class FrancheasyResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class FrancheasyFilters(BaseModel):
+    min_ebitda: Optional[float] = None
+    max_ebitda: Optional[float] = None
+    min_start_capital: Optional[float] = None
+    max_start_capital: Optional[float] = None
+    min_open_store: Optional[float] = None
+    max_open_store: Optional[float] = None
+    min_payback_period: Optional[float] = None
+    max_payback_period: Optional[float] = None
+
+
+class FrancheasyPage(BaseModel):
+    items: List[FrancheasyResponse]
+    next_cursor: Optional[str] = None
@@ -41,4 +41,18 @@ class StoreListItem(BaseModel):
     adress: Optional[str] = None
     cross_country_ability: Optional[float] = None
     latitude: float
-    longitude: float
\ No newline at end of file
+    longitude: float
+
+class StoreNearbyItem(StoreListItem):
+    distance: float
+
+
+class StoreCluster(BaseModel):
+    latitude: float
+    longitude: float
+    count: int
+    store_ids: List[UUID]
+
+class StoreClusters(BaseModel):
+    zoom: int
+    clusters: List[StoreCluster]
@@ -0,0 +1,21 @@
+import argparse
+import asyncio
+from uuid import UUID
+
+from loguru import logger
+
+from app.db.database import get_db_session
+from app.services.business_service import BusinessService
+
+
+async def main(business_id: UUID = None):
+    async with get_db_session() as session:
+        updated = await BusinessService(session).recompute_totals(business_id)
+    logger.info(f"Recomputed totals for {updated} businesses")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute business running totals from business_transactions")
+    parser.add_argument("--business-id", type=UUID, default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.business_id))
@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import json
+import time
+from datetime import timedelta
+
+from loguru import logger
+
+from app.core.config import VKRefreshSettings, VKSettings
+from app.db.database import get_db_session
+from app.db.redis import close_redis
+from app.services.user_service import UserService
+from app.utils.http_client import close_http_client
+from app.utils.vk_auth import VK_ERROR_TOO_MANY_REQUESTS, VKAPIError, get_vk_users_info
+
+# Сколько раз повторять пачку, если VK ответил "слишком много запросов"
+TOO_MANY_REQUESTS_RETRIES = 3
+
+
+class RateBudget:
+    """Не больше rate вызовов в секунду: каждый следующий ждёт своей очереди."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next_at = 0.0
+
+    async def wait(self):
+        now = time.monotonic()
+        if self._next_at > now:
+            await asyncio.sleep(self._next_at - now)
+        self._next_at = max(now, self._next_at) + self.interval
+
+
+async def _fetch_profiles(vk_ids, access_token: str, budget: RateBudget):
+    for attempt in range(TOO_MANY_REQUESTS_RETRIES + 1):
+        await budget.wait()
+        try:
+            return await get_vk_users_info(vk_ids, access_token)
+        except VKAPIError as e:
+            if e.code != VK_ERROR_TOO_MANY_REQUESTS or attempt == TOO_MANY_REQUESTS_RETRIES:
+                raise
+            logger.warning(f"VK rate limit hit, backing off ({attempt + 1}/{TOO_MANY_REQUESTS_RETRIES})")
+            await asyncio.sleep(budget.interval * 2 ** (attempt + 1))
+
+
+async def main(stale_after_hours: float, chunk_size: int, requests_per_second: float):
+    access_token = VKSettings().vk_service_token
+    if not access_token:
+        logger.error("VK_SERVICE_TOKEN is not set, nothing to do")
+        return
+
+    budget = RateBudget(requests_per_second)
+    stale_after = timedelta(hours=stale_after_hours)
+    refreshed = 0
+    chunks = 0
+    last_id = None
+    try:
+        async with get_db_session() as session:
+            service = UserService(session)
+            while True:
+                users = await service.get_stale_vk_users(stale_after, last_id, chunk_size)
+                if not users:
+                    break
+                last_id = users[-1].id
+                profiles = await _fetch_profiles([user.vk_id for user in users], access_token, budget)
+                # vk_json хранится так же, как при логине (create_or_get_vk_user) — JSON-строкой
+                refreshed += await service.bulk_update_vk_json(
+                    {str(profile["id"]): json.dumps(profile) for profile in profiles if "id" in profile}
+                )
+                chunks += 1
+                logger.info(f"Chunk {chunks}: {len(users)} stale users, {refreshed} refreshed so far")
+    finally:
+        await close_http_client()
+        await close_redis()
+    logger.info(f"Refreshed {refreshed} VK profiles in {chunks} chunks")
+
+
+if __name__ == "__main__":
+    settings = VKRefreshSettings()
+    parser = argparse.ArgumentParser(description="Refresh stale Users.vk_json from VK users.get in bulk")
+    parser.add_argument("--stale-after-hours", type=float, default=settings.vk_refresh_stale_after_hours)
+    parser.add_argument("--chunk-size", type=int, default=settings.vk_refresh_chunk_size, choices=range(1, 1001), metavar="1..1000")
+    parser.add_argument("--requests-per-second", type=float, default=settings.vk_refresh_requests_per_second)
+    args = parser.parse_args()
+    asyncio.run(main(args.stale_after_hours, args.chunk_size, args.requests_per_second))
@@ -3,7 +3,9 @@ from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
 from app.models.business_request import BusinessRequest
 from app.models.francheasy import Francheasy
-from app.schemas.business_request import BusinessRequestCreate, BusinessRequestUpdate, RequestStatus
+from app.models.store import Store
+from app.models.povilions import Povilions
+from app.schemas.business_request import BusinessRequestCreate, BusinessRequestUpdate, BusinessRequestListItem, RequestStatus
 from uuid import UUID
 from typing import List, Optional
 
@@ -51,6 +53,41 @@ class BusinessRequestService:
         result = await self.db.execute(select(BusinessRequest).where(BusinessRequest.user_id == user_id))
         return list(result.scalars().all())
 
+    async def get_request_list_items(
+        self,
+        user_id: Optional[UUID] = None,
+        francheasy_owner_id: Optional[UUID] = None,
+        status: Optional[RequestStatus] = None,
+    ) -> List[BusinessRequestListItem]:
+        query = (
+            select(
+                BusinessRequest.request_id,
+                BusinessRequest.user_id,
+                BusinessRequest.francheasy_id,
+                Francheasy.title.label("francheasy_title"),
+                BusinessRequest.store_id,
+                Store.title.label("store_title"),
+                BusinessRequest.povilion_id,
+                Povilions.title.label("povilion_title"),
+                Povilions.price.label("povilion_price"),
+                BusinessRequest.status,
+                BusinessRequest.created_at,
+            )
+            .join(Francheasy, BusinessRequest.francheasy_id == Francheasy.id)
+            .outerjoin(Store, BusinessRequest.store_id == Store.store_id)
+            .outerjoin(Povilions, BusinessRequest.povilion_id == Povilions.povilion_id)
+            .order_by(BusinessRequest.created_at.desc())
+        )
+        if user_id is not None:
+            query = query.where(BusinessRequest.user_id == user_id)
+        if francheasy_owner_id is not None:
+            query = query.where(Francheasy.user_id == francheasy_owner_id)
+        if status is not None:
+            query = query.where(BusinessRequest.status == status.value)
+
+        result = await self.db.execute(query)
+        return [BusinessRequestListItem.model_validate(row) for row in result.mappings().all()]
+
     async def update_request_status(
         self, 
         request_id: UUID, 
@@ -85,7 +122,10 @@ class BusinessRequestService:
             )
             await business_service.create_business(request.user_id, business_create)
         
-        return await self.get_request_by_id(request_id)
+        # update() обновил status в загруженном объекте, но updated_at (onupdate=func.now())
+        # просрочен: без refresh его ленивая загрузка в async упадёт с MissingGreenlet
+        await self.db.refresh(request)
+        return request
 
     async def delete_request(self, request_id: UUID) -> bool:
         from sqlalchemy import delete
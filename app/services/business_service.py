@@ -1,11 +1,14 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import Row, select, insert, update, case, func
 from sqlalchemy.exc import IntegrityError
 from app.models.business import Business
-from app.schemas.business import BusinessCreate, TransactionCreate
-from uuid import UUID
+from app.models.business_transaction import BusinessTransaction
+from app.models.francheasy import Francheasy
+from app.models.store import Store
+from app.models.povilions import Povilions
+from app.schemas.business import BusinessCreate, TransactionCreate, TransactionType
+from uuid import UUID, uuid4
 from typing import List, Optional
-from datetime import datetime
 
 
 class BusinessService:
@@ -18,7 +21,6 @@ class BusinessService:
             francheasy_id=business_in.francheasy_id,
             store_id=business_in.store_id,
             povilion_id=business_in.povilion_id,
-            transactions=[]
         )
         self.db.add(db_business)
         try:
@@ -37,44 +39,71 @@ class BusinessService:
         result = await self.db.execute(select(Business).where(Business.user_id == user_id))
         return list(result.scalars().all())
 
+    async def get_businesses_with_details_by_user(self, user_id: UUID) -> List[Row]:
+        result = await self.db.execute(
+            select(
+                Business,
+                Francheasy.title.label("francheasy_title"),
+                Store.adress.label("store_address"),
+                Povilions.title.label("povilion_title"),
+            )
+            .outerjoin(Francheasy, Business.francheasy_id == Francheasy.id)
+            .outerjoin(Store, Business.store_id == Store.store_id)
+            .outerjoin(Povilions, Business.povilion_id == Povilions.povilion_id)
+            .where(Business.user_id == user_id)
+        )
+        return list(result.all())
+
     async def get_businesses_by_francheasy(self, francheasy_id: UUID) -> List[Business]:
         result = await self.db.execute(select(Business).where(Business.francheasy_id == francheasy_id))
         return list(result.scalars().all())
 
     async def add_transaction(self, business_id: UUID, transaction: TransactionCreate) -> Optional[Business]:
-        business = await self.get_business_by_id(business_id)
-        if not business:
-            return None
-        
-        new_transaction = {
-            "type": transaction.type.value,
-            "amount": transaction.amount,
-            "description": transaction.description,
-            "date": datetime.now().isoformat()
-        }
-        
-        current_transactions = business.transactions if business.transactions else []
-        current_transactions.append(new_transaction)
-        
-        await self.db.execute(
+        inserted = (
+            insert(BusinessTransaction)
+            .values(
+                transaction_id=uuid4(),
+                business_id=business_id,
+                type=transaction.type.value,
+                amount=transaction.amount,
+                description=transaction.description,
+            )
+            .returning(BusinessTransaction.business_id, BusinessTransaction.type, BusinessTransaction.amount)
+            .cte("inserted")
+        )
+        stmt = (
             update(Business)
-            .where(Business.business_id == business_id)
-            .values(transactions=current_transactions)
+            .where(Business.business_id == inserted.c.business_id)
+            .values(
+                total_income=Business.total_income
+                + case((inserted.c.type == TransactionType.INCOME.value, inserted.c.amount), else_=0.0),
+                total_expense=Business.total_expense
+                + case((inserted.c.type == TransactionType.EXPENSE.value, inserted.c.amount), else_=0.0),
+                transaction_count=Business.transaction_count + 1,
+            )
+            .returning(Business)
+            .execution_options(synchronize_session=False, populate_existing=True)
         )
-        await self.db.commit()
-        return await self.get_business_by_id(business_id)
+        try:
+            result = await self.db.execute(stmt)
+            business = result.scalar_one_or_none()
+            await self.db.commit()
+            return business
+        except IntegrityError:
+            await self.db.rollback()
+            return None
+
+    async def get_transactions(self, business_id: UUID) -> List[BusinessTransaction]:
+        result = await self.db.execute(
+            select(BusinessTransaction)
+            .where(BusinessTransaction.business_id == business_id)
+            .order_by(BusinessTransaction.date)
+        )
+        return list(result.scalars().all())
 
     def calculate_totals(self, business: Business) -> dict:
-        transactions = business.transactions if business.transactions else []
-        
-        total_income = 0.0
-        total_expense = 0.0
-        
-        for transaction in transactions:
-            if transaction.get("type") == "income":
-                total_income += float(transaction.get("amount", 0))
-            elif transaction.get("type") == "expense":
-                total_expense += float(transaction.get("amount", 0))
+        total_income = float(business.total_income or 0.0)
+        total_expense = float(business.total_expense or 0.0)
         
         balance = total_income - total_expense
         
@@ -88,6 +117,59 @@ class BusinessService:
             "profit_percentage": round(profit_percentage, 2)
         }
 
+    async def recompute_totals(self, business_id: Optional[UUID] = None, batch_size: int = 1000) -> int:
+        income = (
+            select(func.coalesce(func.sum(BusinessTransaction.amount), 0.0))
+            .where(
+                BusinessTransaction.business_id == Business.business_id,
+                BusinessTransaction.type == TransactionType.INCOME.value,
+            )
+            .scalar_subquery()
+        )
+        expense = (
+            select(func.coalesce(func.sum(BusinessTransaction.amount), 0.0))
+            .where(
+                BusinessTransaction.business_id == Business.business_id,
+                BusinessTransaction.type == TransactionType.EXPENSE.value,
+            )
+            .scalar_subquery()
+        )
+        count = (
+            select(func.count())
+            .where(BusinessTransaction.business_id == Business.business_id)
+            .scalar_subquery()
+        )
+
+        updated = 0
+        last_business_id = None
+        while True:
+            # Блокируем пачку строк до пересчёта, чтобы параллельный add_transaction
+            # не потерялся между чтением сумм и записью счётчиков.
+            query = select(Business.business_id).order_by(Business.business_id).limit(batch_size).with_for_update()
+            if business_id is not None:
+                query = query.where(Business.business_id == business_id)
+            if last_business_id is not None:
+                query = query.where(Business.business_id > last_business_id)
+            ids = list((await self.db.execute(query)).scalars().all())
+            if not ids:
+                break
+
+            await self.db.execute(
+                update(Business)
+                .where(Business.business_id.in_(ids))
+                .values(
+                    total_income=income,
+                    total_expense=expense,
+                    transaction_count=count,
+                    updated_at=Business.updated_at,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await self.db.commit()
+            updated += len(ids)
+            last_business_id = ids[-1]
+        return updated
+
     async def delete_business(self, business_id: UUID) -> bool:
         from sqlalchemy import delete
         result = await self.db.execute(delete(Business).where(Business.business_id == business_id))
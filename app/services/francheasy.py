@@ -1,14 +1,62 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, tuple_, func, cast, literal
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from app.db.cache import cached, invalidate
+from app.db.loader import get_loader
 from app.models.francheasy import Francheasy
-from app.schemas.francheasy import FrancheasyCreate, FrancheasyUpdate
-from typing import List, Optional
+from app.schemas.francheasy import FrancheasyCreate, FrancheasyFilters, FrancheasySort, FrancheasyUpdate, SortOrder
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.response_cache import ResponseCache
+from datetime import datetime
+from typing import List, Optional, Tuple
+import re
 import uuid
 
+SORT_COLUMNS = {
+    FrancheasySort.CREATED_AT: Francheasy.created_at,
+    FrancheasySort.EBITDA: Francheasy.ebitda,
+    FrancheasySort.START_CAPITAL: Francheasy.start_capital,
+    FrancheasySort.OPEN_STORE: Francheasy.open_store,
+    FrancheasySort.PAYBACK_PERIOD: Francheasy.payback_period,
+}
+
+SEARCH_CONFIG = "russian"
+SEARCH_MAX_TERMS = 8
+
+FILTER_COLUMNS = {
+    "ebitda": Francheasy.ebitda,
+    "start_capital": Francheasy.start_capital,
+    "open_store": Francheasy.open_store,
+    "payback_period": Francheasy.payback_period,
+}
+
+
+francheasy_cache = ResponseCache("francheasy")
+
+def list_cache_keys(path: str, query_items) -> Tuple[str, str]:
+    return francheasy_cache.key("list", ResponseCache.query_hash(path, query_items)), francheasy_cache.gen_key("list")
+
+def detail_cache_keys(francheasy_id: uuid.UUID) -> Tuple[str, str]:
+    return francheasy_cache.key("detail", str(francheasy_id)), francheasy_cache.gen_key("detail", str(francheasy_id))
+
+async def invalidate_francheasy_cache(francheasy_id: Optional[uuid.UUID] = None):
+    gen_keys = [francheasy_cache.gen_key("list")]
+    if francheasy_id is not None:
+        gen_keys.append(detail_cache_keys(francheasy_id)[1])
+    await francheasy_cache.invalidate(*gen_keys)
+
+
+def build_prefix_tsquery(q: str) -> Optional[str]:
+    terms = re.findall(r"[^\W_]+", q.lower())[:SEARCH_MAX_TERMS]
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
 
 class FrancheasyService:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.loader = get_loader(db, Francheasy, Francheasy.id)
 
     async def create_francheasy(
         self,
@@ -28,13 +76,12 @@ class FrancheasyService:
         self.db.add(francheasy)
         await self.db.commit()
         await self.db.refresh(francheasy)
+        await invalidate_francheasy_cache()
         return francheasy
 
+    @cached(Francheasy)
     async def get_francheasy_by_id(self, francheasy_id: str) -> Optional[Francheasy]:
-        res = await self.db.execute(
-            select(Francheasy).where(Francheasy.id == uuid.UUID(francheasy_id))
-        )
-        return res.scalar_one_or_none()
+        return await self.loader.load(uuid.UUID(str(francheasy_id)))
 
     async def get_francheasy_by_user(self, user_id: str) -> List[Francheasy]:
         res = await self.db.execute(
@@ -42,11 +89,104 @@ class FrancheasyService:
         )
         return list(res.scalars().all())
 
-    async def get_all_francheasy(self) -> List[Francheasy]:
-        res = await self.db.execute(
-            select(Francheasy).order_by(Francheasy.created_at.desc())
+    async def get_francheasy_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        filters: Optional[FrancheasyFilters] = None,
+        sort: FrancheasySort = FrancheasySort.CREATED_AT,
+        order: SortOrder = SortOrder.DESC,
+    ) -> Tuple[List[Francheasy], Optional[str]]:
+        sort_column = SORT_COLUMNS[sort]
+        if order == SortOrder.DESC:
+            query = select(Francheasy).order_by(sort_column.desc(), Francheasy.id.desc())
+        else:
+            query = select(Francheasy).order_by(sort_column.asc(), Francheasy.id.asc())
+
+        if filters:
+            for name, column in FILTER_COLUMNS.items():
+                min_value = getattr(filters, f"min_{name}")
+                max_value = getattr(filters, f"max_{name}")
+                if min_value is not None:
+                    query = query.where(column >= min_value)
+                if max_value is not None:
+                    query = query.where(column <= max_value)
+        if sort == FrancheasySort.PAYBACK_PERIOD:
+            # Срок окупаемости не определён при ebitda <= 0 — такие франшизы в эту сортировку не попадают
+            query = query.where(Francheasy.payback_period.isnot(None))
+
+        if cursor:
+            payload = decode_cursor(cursor)
+            if payload.get("sort") != sort.value or payload.get("order") != order.value:
+                raise ValueError("Cursor does not match sort order")
+            try:
+                if sort == FrancheasySort.CREATED_AT:
+                    last_value = datetime.fromisoformat(payload["value"])
+                else:
+                    last_value = float(payload["value"])
+                last_id = uuid.UUID(payload["id"])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError("Invalid cursor")
+            position = tuple_(sort_column, Francheasy.id)
+            if order == SortOrder.DESC:
+                query = query.where(position < tuple_(last_value, last_id))
+            else:
+                query = query.where(position > tuple_(last_value, last_id))
+
+        res = await self.db.execute(query.limit(limit + 1))
+        items = list(res.scalars().all())
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            last_value = getattr(last, sort_column.key)
+            next_cursor = encode_cursor({
+                "sort": sort.value,
+                "order": order.value,
+                "value": last_value.isoformat() if isinstance(last_value, datetime) else last_value,
+                "id": str(last.id),
+            })
+        return items, next_cursor
+
+    async def search_francheasy(
+        self,
+        q: str,
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Francheasy], Optional[str]]:
+        tsquery_text = build_prefix_tsquery(q)
+        if tsquery_text is None:
+            return [], None
+
+        ts_query = func.to_tsquery(cast(literal(SEARCH_CONFIG), REGCONFIG), tsquery_text)
+        rank = func.ts_rank(Francheasy.title_tsv, ts_query)
+        query = (
+            select(Francheasy, rank.label("rank"))
+            .where(Francheasy.title_tsv.op("@@")(ts_query))
+            .order_by(rank.desc(), Francheasy.id.desc())
         )
-        return list(res.scalars().all())
+
+        if cursor:
+            payload = decode_cursor(cursor)
+            if payload.get("sort") != "rank" or payload.get("q") != q:
+                raise ValueError("Cursor does not match search query")
+            try:
+                last_rank = float(payload["value"])
+                last_id = uuid.UUID(payload["id"])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError("Invalid cursor")
+            query = query.where(tuple_(rank, Francheasy.id) < tuple_(last_rank, last_id))
+
+        res = await self.db.execute(query.limit(limit + 1))
+        rows = list(res.all())
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last, last_rank = rows[-1]
+            next_cursor = encode_cursor({"sort": "rank", "q": q, "value": last_rank, "id": str(last.id)})
+        return [francheasy for francheasy, _ in rows], next_cursor
 
     async def add_francheasy_photos(self, francheasy_id: str, photos_b64: List[str]) -> Francheasy:
         francheasy = await self.get_francheasy_by_id(francheasy_id)
@@ -56,6 +196,8 @@ class FrancheasyService:
         francheasy.s3_photo_francheasy_keys = existing + list(photos_b64)
         await self.db.commit()
         await self.db.refresh(francheasy)
+        await invalidate(Francheasy)
+        await invalidate_francheasy_cache(francheasy.id)
         return francheasy
 
     async def update_francheasy(self, francheasy_id: str, update_data: dict) -> Francheasy:
@@ -75,6 +217,8 @@ class FrancheasyService:
             francheasy.title = update_data["title"]
         await self.db.commit()
         await self.db.refresh(francheasy)
+        await invalidate(Francheasy)
+        await invalidate_francheasy_cache(francheasy.id)
         
         return francheasy
 
@@ -87,4 +231,7 @@ class FrancheasyService:
             delete(Francheasy).where(Francheasy.id == uuid.UUID(francheasy_id))
         )
         await self.db.commit()
+        self.loader.clear(francheasy.id)
+        await invalidate(Francheasy)
+        await invalidate_francheasy_cache(francheasy.id)
         return True
\ No newline at end of file
@@ -1,65 +1,69 @@
 import uuid
 import json
-import redis
 from typing import Dict, Optional
-from app.core.config import RedisSettings
 
-redis_settings = RedisSettings()
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.db.redis import get_redis
+
 
 class PKCEService:
-    def __init__(self):
-        redis_params = {
-            'host': redis_settings.redis_network_name,
-            'port': redis_settings.redis_port,
-            'decode_responses': True
-        }
-        
-        if redis_settings.redis_password:
-            redis_params['password'] = redis_settings.redis_password
-        
-        if redis_settings.redis_user and redis_settings.redis_user_password:
-            redis_params['username'] = redis_settings.redis_user
-            redis_params['password'] = redis_settings.redis_user_password
-        
-        try:
-            self.redis_client = redis.Redis(**redis_params)
-            self.redis_client.ping()
-        except redis.exceptions.ConnectionError as e:
-            raise Exception(f"Failed to connect to Redis: {e}")
-        except redis.exceptions.AuthenticationError as e:
-            raise Exception(f"Redis authentication failed: {e}")
-    
+    """PKCE-пары VK-логина в Redis через общий асинхронный пул (app.db.redis)."""
+
+    def __init__(self, redis_client: Optional[aioredis.Redis] = None):
+        self._redis_client = redis_client
+
+    @property
+    def redis_client(self) -> aioredis.Redis:
+        # Клиент берём лениво: пул создаётся в lifespan и пересоздаётся после close_redis()
+        return self._redis_client or get_redis()
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"pkce:{session_id}"
+
     async def store_pkce_pair(self, code_verifier: str, code_challenge: str, ttl: int = 300) -> str:
         session_id = str(uuid.uuid4())
 
         pkce_data = {
             "verifier": code_verifier,
             "challenge": code_challenge,
-        }    
+        }
 
         try:
-            self.redis_client.setex(
-                f"pkce:{session_id}",
+            await self.redis_client.setex(
+                self._key(session_id),
                 ttl,
                 json.dumps(pkce_data)
             )
-        except redis.exceptions.RedisError as e:
+        except RedisError as e:
             raise Exception(f"Failed to store PKCE pair in Redis: {e}")
 
         return session_id
-    
+
     async def get_pkce_pair(self, session_id: str) -> Optional[Dict[str, str]]:
         try:
-            data = self.redis_client.get(f"pkce:{session_id}")
+            data = await self.redis_client.get(self._key(session_id))
             if data:
                 return json.loads(data)
             return None
-        except redis.exceptions.RedisError as e:
+        except RedisError as e:
             raise Exception(f"Failed to get PKCE pair from Redis: {e}")
 
+    async def pop_pkce_pair(self, session_id: str) -> Optional[Dict[str, str]]:
+        """Читает и удаляет пару одной командой GETDEL: state нельзя использовать дважды."""
+        try:
+            data = await self.redis_client.getdel(self._key(session_id))
+            if data:
+                return json.loads(data)
+            return None
+        except RedisError as e:
+            raise Exception(f"Failed to pop PKCE pair from Redis: {e}")
+
     async def delete_pkce_pair(self, session_id: str) -> bool:
         try:
-            result = self.redis_client.delete(f"pkce:{session_id}")
+            result = await self.redis_client.delete(self._key(session_id))
             return result > 0
-        except redis.exceptions.RedisError as e:
-            raise Exception(f"Failed to delete PKCE pair from Redis: {e}")
\ No newline at end of file
+        except RedisError as e:
+            raise Exception(f"Failed to delete PKCE pair from Redis: {e}")
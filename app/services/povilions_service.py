@@ -1,6 +1,8 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, func
 from sqlalchemy.exc import IntegrityError
+from app.db.cache import cached, invalidate
+from app.db.loader import get_loader
 from app.models.povilions import Povilions
 from app.schemas.povilions import PovilionsCreate, PovilionsUpdate
 from uuid import UUID
@@ -10,6 +12,7 @@ from typing import List, Optional
 class PovilionsService:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.loader = get_loader(db, Povilions, Povilions.povilion_id)
 
     async def create_povilion(self, user_id: UUID, povilion_in: PovilionsCreate) -> Povilions:
         db_povilion = Povilions(
@@ -27,14 +30,20 @@ class PovilionsService:
             await self.db.rollback()
             raise ValueError(f"Ошибка при создании павильона: {e}")
 
+    @cached(Povilions)
     async def get_povilion_by_id(self, povilion_id: UUID) -> Optional[Povilions]:
-        result = await self.db.execute(select(Povilions).where(Povilions.povilion_id == povilion_id))
-        return result.scalar_one_or_none()
+        return await self.loader.load(povilion_id)
 
     async def get_povilions_by_store(self, store_id: UUID) -> List[Povilions]:
         result = await self.db.execute(select(Povilions).where(Povilions.store_id == store_id))
         return list(result.scalars().all())
 
+    async def get_store_povilions_version(self, store_id: UUID):
+        result = await self.db.execute(
+            select(func.count(), func.max(Povilions.updated_at)).where(Povilions.store_id == store_id)
+        )
+        return result.one()
+
     async def get_povilions_by_user(self, user_id: UUID) -> List[Povilions]:
         result = await self.db.execute(select(Povilions).where(Povilions.user_id == user_id))
         return list(result.scalars().all())
@@ -50,10 +59,14 @@ class PovilionsService:
             .values(**values)
         )
         await self.db.commit()
+        self.loader.clear(povilion_id)
+        await invalidate(Povilions)
         return await self.get_povilion_by_id(povilion_id)
 
     async def delete_povilion(self, povilion_id: UUID) -> bool:
         result = await self.db.execute(delete(Povilions).where(Povilions.povilion_id == povilion_id))
         await self.db.commit()
+        self.loader.clear(povilion_id)
+        await invalidate(Povilions)
         return result.rowcount > 0
 
@@ -1,30 +1,120 @@
 from app.core.config import MinioSettings
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 import uuid
 import json
+import time
+import os
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import UploadFile
 import asyncio
-from typing import Optional
+from typing import Callable, Dict, Optional, TypeVar
 
 minio_settings = MinioSettings()
 
-class S3Service:
+T = TypeVar("T")
+
+
+class UploadTooLargeError(ValueError):
+    def __init__(self, filename: Optional[str], size: int, max_size: int):
+        super().__init__(f"File {filename or ''} is too large: {size} bytes, maximum is {max_size} bytes")
+        self.size = size
+        self.max_size = max_size
+
+
+class S3OperationStats:
     def __init__(self):
-        self.s3_client = boto3.client(
+        self.waiting = 0
+        self.waiting_max = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.errors = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "waiting": self.waiting,
+            "waiting_max": self.waiting_max,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "errors": self.errors,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+        }
+
+
+class S3Service:
+    def __init__(self, settings: MinioSettings = minio_settings, s3_client=None):
+        self.settings = settings
+        self.s3_client = s3_client or boto3.client(
             's3',
-            aws_access_key_id=minio_settings.minio_root_user,
-            aws_secret_access_key=minio_settings.minio_root_password,
-            endpoint_url=minio_settings.minio_endpoint_url
+            aws_access_key_id=settings.minio_root_user,
+            aws_secret_access_key=settings.minio_root_password,
+            endpoint_url=settings.minio_endpoint_url,
+            config=Config(
+                max_pool_connections=settings.s3_max_pool_connections,
+                connect_timeout=settings.s3_connect_timeout,
+                read_timeout=settings.s3_read_timeout,
+                retries={"max_attempts": 3, "mode": "standard"},
+            ),
         )
-        
-        self.bucket = minio_settings.minio_bucket_name
-        endpoint_url = str(minio_settings.minio_endpoint_url)
+        # boto3 синхронный: вызовы идут в собственный пул, а не в общий executor loop
+        self._executor = ThreadPoolExecutor(max_workers=settings.s3_max_workers, thread_name_prefix="s3")
+        self._limits = {
+            "upload": asyncio.Semaphore(settings.s3_max_upload_concurrency),
+            "download": asyncio.Semaphore(settings.s3_max_download_concurrency),
+        }
+        self.stats: Dict[str, S3OperationStats] = {operation: S3OperationStats() for operation in self._limits}
+        # use_threads=False: части идут по очереди в потоке пула S3, без своих потоков s3transfer,
+        # поэтому на загрузку в памяти не больше одной части
+        self._transfer_config = TransferConfig(
+            multipart_threshold=settings.s3_multipart_threshold,
+            multipart_chunksize=settings.s3_multipart_chunksize,
+            use_threads=False,
+        )
+
+        self.bucket = settings.minio_bucket_name
+        endpoint_url = str(settings.minio_endpoint_url)
         if endpoint_url.startswith('http://'):
             self.base_url = endpoint_url.replace('http://', 'https://').rstrip('/')
         else:
             self.base_url = endpoint_url.rstrip('/')
         self._ensure_bucket_exists()
 
+    async def _run(self, operation: str, fn: Callable[[], T]) -> T:
+        """Выполняет fn в пуле S3, не больше s3_max_<operation>_concurrency одновременно."""
+        stats = self.stats[operation]
+        stats.waiting += 1
+        stats.waiting_max = max(stats.waiting_max, stats.waiting)
+        started = time.perf_counter()
+        try:
+            await self._limits[operation].acquire()
+        finally:
+            stats.waiting -= 1
+        waited = time.perf_counter() - started
+        stats.wait_seconds_total += waited
+        stats.wait_seconds_max = max(stats.wait_seconds_max, waited)
+
+        stats.in_flight += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, fn)
+            stats.completed += 1
+            return result
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+            self._limits[operation].release()
+
+    def get_stats(self) -> dict:
+        return {operation: stats.as_dict() for operation, stats in self.stats.items()}
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
     def _ensure_bucket_exists(self):
         try:
             self.s3_client.head_bucket(Bucket=self.bucket)
@@ -59,23 +149,39 @@ class S3Service:
     
     async def upload_file(self, car_id: str, file: UploadFile, folder: str = "photos") -> str:
         key = self._generate_key(car_id, file.filename, folder)
-        
-        file_content = await file.read()
-        
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
-            lambda: self.s3_client.put_object(
-                Bucket=self.bucket,
-                Key=key,
-                Body=file_content,
-                ACL="public-read",
-                ContentType=file.content_type,
-            ),
-        )
+        await self._upload_stream(key, file)
 
         return f"{self.base_url}/{self.bucket}/{key}"
 
+    @staticmethod
+    def upload_size(file: UploadFile) -> int:
+        if file.size is not None:
+            return file.size
+        file.file.seek(0, os.SEEK_END)
+        size = file.file.tell()
+        file.file.seek(0)
+        return size
+
+    def check_upload_size(self, file: UploadFile):
+        size = self.upload_size(file)
+        if size > self.settings.s3_max_upload_size:
+            raise UploadTooLargeError(file.filename, size, self.settings.s3_max_upload_size)
+
+    async def _upload_stream(self, key: str, file: UploadFile):
+        """Грузит UploadFile из его spool-файла частями, не читая целиком в память."""
+        self.check_upload_size(file)
+        extra_args = {"ACL": "public-read"}
+        if file.content_type:
+            extra_args["ContentType"] = file.content_type
+
+        def upload():
+            file.file.seek(0)
+            self.s3_client.upload_fileobj(
+                file.file, self.bucket, key, ExtraArgs=extra_args, Config=self._transfer_config
+            )
+
+        await self._run("upload", upload)
+
     def make_url(self, key: str) -> str:
         return f"{self.base_url}/{self.bucket}/{key}"
 
@@ -85,20 +191,7 @@ class S3Service:
 
     async def upload_file_get_key(self, car_id: str, file: UploadFile, folder: str = "photos") -> str:
         key = self._generate_key(car_id, file.filename, folder)
-        
-        file_content = await file.read()
-        
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
-            lambda: self.s3_client.put_object(
-                Bucket=self.bucket,
-                Key=key,
-                Body=file_content,
-                ACL="public-read",
-                ContentType=file.content_type,
-            ),
-        )
+        await self._upload_stream(key, file)
         return key
 
     async def upload_file_from_bytes(self, car_id: str, file_bytes: bytes, filename: Optional[str] = None, content_type: Optional[str] = None, folder: str = "photos") -> str:
@@ -108,9 +201,8 @@ class S3Service:
         if content_type:
             extra_args["ContentType"] = content_type
 
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
+        await self._run(
+            "upload",
             lambda: self.s3_client.put_object(
                 Bucket=self.bucket,
                 Key=key,
@@ -125,9 +217,8 @@ class S3Service:
         key = f"{car_id}/{folder}/photos.json"
         body = json.dumps({"photos": urls})
 
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
+        await self._run(
+            "upload",
             lambda: self.s3_client.put_object(
                 Bucket=self.bucket,
                 Key=key,
@@ -141,15 +232,13 @@ class S3Service:
 
     async def get_file_by_key(self, key: str):
         
-        loop = asyncio.get_event_loop()
+        def download():
+            result = self.s3_client.get_object(Bucket=self.bucket, Key=key)
+            # Тело читается в том же потоке: read() блокирующий
+            return result['Body'].read(), result.get('ContentType', 'application/octet-stream')
+
         try:
-            result = await loop.run_in_executor(
-                None,
-                lambda: self.s3_client.get_object(Bucket=self.bucket, Key=key)
-            )
-            file_bytes = result['Body'].read()
-            content_type = result.get('ContentType', 'application/octet-stream')
-            return file_bytes, content_type
+            return await self._run("download", download)
         except self.s3_client.exceptions.NoSuchKey:
             raise FileNotFoundError(f"File with key {key} not found")
     async def generate_presigned_url(self, key: str, expires_in: int = 3600) -> str:
@@ -1,20 +1,51 @@
+import hashlib
 import secrets
-from typing import Set
+import time
+
+from loguru import logger
+from redis.exceptions import RedisError
+
+from app.core.config import DocsSettings
+from app.db.redis import get_redis
+
 
 class SessionService:
-    def __init__(self):
-        self.active_sessions: Set[str] = set()
-    
+    """Сессии /docs и /redoc в Redis, общие для всех воркеров.
+
+    Ключ — sha256 токена (сам токен в Redis не хранится), значение — время
+    входа. Проверка делает GETEX: одним запросом читает запись и продлевает
+    TTL. Брошенные сессии истекают сами, поэтому память ограничена числом
+    активных входов.
+    """
+
+    def __init__(self, settings: DocsSettings):
+        self.settings = settings
+
+    @staticmethod
+    def _key(session_token: str) -> str:
+        return "docs-session:" + hashlib.sha256(session_token.encode()).hexdigest()
+
     def create_session_token(self) -> str:
         return secrets.token_urlsafe(32)
-    
-    def is_valid_session(self, session_token: str) -> bool:
-        return session_token in self.active_sessions
-    
-    def add_session(self, session_token: str):
-        self.active_sessions.add(session_token)
-    
-    def remove_session(self, session_token: str):
-        self.active_sessions.discard(session_token)
-
-session_service = SessionService()
\ No newline at end of file
+
+    async def is_valid_session(self, session_token: str) -> bool:
+        key = self._key(session_token)
+        try:
+            created_at = await get_redis().getex(key, ex=self.settings.docs_session_ttl)
+            if created_at is None:
+                return False
+            if time.time() - float(created_at) > self.settings.docs_session_max_age:
+                await get_redis().delete(key)
+                return False
+            return True
+        except RedisError as e:
+            logger.warning(f"Docs session check failed: {e}")
+            return False
+
+    async def add_session(self, session_token: str):
+        await get_redis().set(self._key(session_token), int(time.time()), ex=self.settings.docs_session_ttl)
+
+    async def remove_session(self, session_token: str):
+        await get_redis().delete(self._key(session_token))
+
+session_service = SessionService(DocsSettings())
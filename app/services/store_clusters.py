@@ -0,0 +1,117 @@
+import asyncio
+from typing import Dict, List, Tuple
+
+from cachetools import TTLCache
+from loguru import logger
+from redis.exceptions import RedisError
+
+from app.db.redis import get_pubsub_redis, get_redis
+from app.services.store_geo_index import get_geo_settings
+from app.utils.tiles import MAX_ZOOM, tile_for
+
+# Тайл делится на 2^CLUSTER_GRID_BITS x 2^CLUSTER_GRID_BITS ячеек (8x8 ≈ 32px на тайл 256px)
+CLUSTER_GRID_BITS = 3
+CLUSTER_SAMPLE_SIZE = 5
+MAX_CLUSTER_TILES = 64
+
+
+class StoreClusterCache:
+    """Кластеры магазинов по ключу (zoom, x, y) в памяти процесса.
+
+    Запись сбрасывает тайлы старой и новой точки на всех зумах в своём
+    процессе и рассылает точку через Redis pub/sub остальным воркерам.
+    TTL ограничивает устаревание, если сообщение потерялось.
+    """
+
+    RECONNECT_DELAY = 1.0
+    MAX_RECONNECT_DELAY = 30.0
+
+    def __init__(self, maxsize: int, ttl: float, channel: str):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.channel = channel
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Растёт при каждой инвалидации: кластеры, посчитанные до неё, в кэш не попадают
+        self.epoch = 0
+
+    def get_many(self, keys: List[Tuple[int, int, int]]) -> Tuple[Dict[Tuple[int, int, int], list], List[Tuple[int, int, int]]]:
+        found, missing = {}, []
+        for key in keys:
+            clusters = self._cache.get(key)
+            if clusters is None:
+                missing.append(key)
+            else:
+                found[key] = clusters
+        self.hits += len(found)
+        self.misses += len(missing)
+        return found, missing
+
+    def set(self, key: Tuple[int, int, int], clusters: list, epoch: int):
+        if epoch == self.epoch:
+            self._cache[key] = clusters
+
+    def discard_point(self, latitude: float, longitude: float):
+        self.epoch += 1
+        for zoom in range(MAX_ZOOM + 1):
+            if self._cache.pop((zoom, *tile_for(latitude, longitude, zoom)), None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        self.epoch += 1
+        self._cache.clear()
+
+    async def invalidate_point(self, latitude: float, longitude: float):
+        self.discard_point(latitude, longitude)
+        try:
+            await get_redis().publish(self.channel, f"{latitude},{longitude}")
+        except RedisError as e:
+            logger.warning(f"Failed to broadcast store cluster invalidation for {latitude},{longitude}: {e}")
+
+    async def listen(self):
+        delay = self.RECONNECT_DELAY
+        while True:
+            pubsub = get_pubsub_redis().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                delay = self.RECONNECT_DELAY
+                async for message in pubsub.listen():
+                    try:
+                        latitude, longitude = map(float, message["data"].decode().split(","))
+                    except (AttributeError, ValueError):
+                        continue
+                    self.discard_point(latitude, longitude)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Пока подписки нет, сообщения теряются — сбрасываем всё, чтобы не жить на устаревшем
+                self.clear()
+                logger.warning(f"Store cluster invalidation listener failed, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+store_cluster_cache = StoreClusterCache(
+    maxsize=get_geo_settings().store_cluster_cache_size,
+    ttl=get_geo_settings().store_cluster_cache_ttl,
+    channel=get_geo_settings().store_cluster_cache_channel,
+)
+
+def start_store_cluster_listener() -> asyncio.Task:
+    return asyncio.create_task(store_cluster_cache.listen())
+
+def get_store_cluster_stats() -> dict:
+    return store_cluster_cache.stats()
@@ -0,0 +1,94 @@
+import asyncio
+import time
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import select
+
+from app.core.config import GeoSettings, StoreGeoBackend
+from app.db.database import get_async_sessionmaker
+from app.models.store import Store
+from app.utils.geo_index import GeoIndex
+
+_geo_settings = None
+
+def get_geo_settings() -> GeoSettings:
+    global _geo_settings
+    if _geo_settings is None:
+        _geo_settings = GeoSettings()
+    return _geo_settings
+
+def uses_memory_index() -> bool:
+    return get_geo_settings().store_geo_backend == StoreGeoBackend.MEMORY
+
+
+class StoreGeoIndex(GeoIndex):
+    """Индекс координат магазинов для инсталляций без PostGIS.
+
+    Строится при старте, дальше обновляется из StoreService. Записи других
+    воркеров сюда не попадают, их подтягивает периодическая сверка с таблицей.
+    """
+
+    def __init__(self, cell_degrees: float = 0.05):
+        super().__init__(cell_degrees)
+        self.checked_at: Optional[float] = None
+        self.last_diff = {"missing": 0, "extra": 0, "moved": 0}
+        self.rebuilds = 0
+
+    async def _fetch_points(self):
+        async with get_async_sessionmaker()() as session:
+            result = await session.execute(select(Store.store_id, Store.latitude, Store.longitude))
+            return result.all()
+
+    async def load(self):
+        started = time.perf_counter()
+        self.build(await self._fetch_points())
+        logger.info(f"Store geo index built: {len(self)} stores in {time.perf_counter() - started:.3f}s")
+
+    async def check(self) -> dict:
+        """Сверяет индекс с таблицей stores и перестраивает его при расхождении."""
+        points = await self._fetch_points()
+        self.last_diff = self.diff(points)
+        self.checked_at = time.time()
+        if any(self.last_diff.values()):
+            logger.warning(f"Store geo index is out of sync with stores table: {self.last_diff}, rebuilding")
+            self.build(points)
+            self.rebuilds += 1
+        return self.last_diff
+
+    async def resync_forever(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.warning(f"Store geo index consistency check failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "backend": get_geo_settings().store_geo_backend.value,
+            "ready": self.ready,
+            "size": len(self),
+            "cells": len(self._cells),
+            "built_at": self.built_at,
+            "checked_at": self.checked_at,
+            "last_diff": self.last_diff,
+            "rebuilds": self.rebuilds,
+        }
+
+
+store_geo_index = StoreGeoIndex(get_geo_settings().store_geo_cell_degrees)
+
+async def start_store_geo_index() -> Optional[asyncio.Task]:
+    if not uses_memory_index():
+        return None
+    await store_geo_index.load()
+    interval = get_geo_settings().store_geo_resync_interval
+    if not interval:
+        return None
+    return asyncio.create_task(store_geo_index.resync_forever(interval))
+
+def get_store_geo_index_stats() -> dict:
+    if not uses_memory_index():
+        return {}
+    return store_geo_index.stats()
@@ -1,16 +1,29 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete
 from sqlalchemy.exc import IntegrityError
+from app.db.cache import cached, invalidate
+from app.db.loader import get_loader
+from app.models.povilions import Povilions
 from app.models.store import Store
+from app.services.store_clusters import CLUSTER_GRID_BITS, CLUSTER_SAMPLE_SIZE, store_cluster_cache
+from app.services.store_geo_index import store_geo_index, uses_memory_index
+from app.utils.tiles import MAX_LATITUDE, tile_bounds
 from app.schemas.store import StoreCreate, StoreUpdate
 from uuid import UUID
 from datetime import datetime
-from typing import List, Optional
-from sqlalchemy import func
+from typing import List, Optional, Tuple
+from sqlalchemy import Float, func, cast
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, aggregate_order_by
+from geoalchemy2 import Geography
+
+
+def make_point(latitude: float, longitude: float):
+    return cast(func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326), Geography(geometry_type="POINT", srid=4326))
 
 class StoreService:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.loader = get_loader(db, Store, Store.store_id)
 
     async def create_store(self, user_id: UUID, store_in: StoreCreate) -> Store:
         db_store = Store(
@@ -25,14 +38,27 @@ class StoreService:
         try:
             await self.db.commit()
             await self.db.refresh(db_store)
+            if store_geo_index.ready:
+                store_geo_index.upsert(db_store.store_id, db_store.latitude, db_store.longitude)
+            await store_cluster_cache.invalidate_point(db_store.latitude, db_store.longitude)
             return db_store
         except IntegrityError as e:
             await self.db.rollback()
             raise ValueError(f"Ошибка при создании магазина: {e}")
 
+    @cached(Store)
     async def get_store_by_id(self, store_id: UUID) -> Optional[Store]:
-        result = await self.db.execute(select(Store).where(Store.store_id == store_id))
-        return result.scalar_one_or_none()
+        return await self.loader.load(store_id)
+
+    async def get_store_version(self, store_id: UUID):
+        """updated_at магазина и сводка по его павильонам (они входят в ответ) — для ETag."""
+        result = await self.db.execute(
+            select(Store.updated_at, func.count(Povilions.povilion_id), func.max(Povilions.updated_at))
+            .outerjoin(Povilions, Povilions.store_id == Store.store_id)
+            .where(Store.store_id == store_id)
+            .group_by(Store.store_id)
+        )
+        return result.first()
 
     async def get_stores_by_user(self, user_id: UUID) -> List[Store]:
         result = await self.db.execute(select(Store).where(Store.user_id == user_id))
@@ -43,20 +69,130 @@ class StoreService:
         if not values:
             return await self.get_store_by_id(store_id)
 
-
+        previous = await self.get_store_by_id(store_id)
+        old_point = (previous.latitude, previous.longitude) if previous is not None else None
         await self.db.execute(
             update(Store)
             .where(Store.store_id == store_id)
             .values(**values)
         )
         await self.db.commit()
-        return await self.get_store_by_id(store_id)
+        self.loader.clear(store_id)
+        await invalidate(Store)
+        store = await self.get_store_by_id(store_id)
+        if store is not None:
+            # Сэмпл store_ids в кластере тоже может устареть, поэтому тайл сбрасываем на любое изменение
+            await store_cluster_cache.invalidate_point(store.latitude, store.longitude)
+            if old_point is not None and old_point != (store.latitude, store.longitude):
+                await store_cluster_cache.invalidate_point(*old_point)
+                if store_geo_index.ready:
+                    store_geo_index.upsert(store.store_id, store.latitude, store.longitude)
+        return store
 
     async def delete_store(self, store_id: UUID) -> bool:
-        result = await self.db.execute(delete(Store).where(Store.store_id == store_id))
+        result = await self.db.execute(
+            delete(Store).where(Store.store_id == store_id).returning(Store.latitude, Store.longitude)
+        )
+        deleted = result.first()
         await self.db.commit()
-        return result.rowcount > 0
+        self.loader.clear(store_id)
+        await invalidate(Store)
+        store_geo_index.remove(store_id)
+        if deleted is None:
+            return False
+        await store_cluster_cache.invalidate_point(deleted.latitude, deleted.longitude)
+        return True
     
     async def get_all_stores(self) -> List[Store]:
         result = await self.db.execute(select(Store))
-        return list(result.scalars().all())
\ No newline at end of file
+        return list(result.scalars().all())
+
+    async def get_nearby_stores(
+        self, latitude: float, longitude: float, radius: float, limit: int
+    ) -> List[Tuple[Store, float]]:
+        if uses_memory_index():
+            return await self._load_hits(store_geo_index.nearest(latitude, longitude, limit, max_distance=radius))
+        point = make_point(latitude, longitude)
+        distance = func.ST_Distance(Store.location, point)
+        result = await self.db.execute(
+            select(Store, distance.label("distance"))
+            .where(func.ST_DWithin(Store.location, point, radius))
+            .order_by(Store.location.op("<->")(point))
+            .limit(limit)
+        )
+        return [(store, dist) for store, dist in result.all()]
+
+    async def get_stores_in_bbox(
+        self, min_lat: float, min_lon: float, max_lat: float, max_lon: float, limit: int
+    ) -> List[Store]:
+        if uses_memory_index():
+            hits = store_geo_index.in_bbox(min_lat, min_lon, max_lat, max_lon, limit)
+            return [store for store, _ in await self._load_hits(hits)]
+        envelope = cast(func.ST_MakeEnvelope(min_lon, min_lat, max_lon, max_lat, 4326), Geography(geometry_type="POLYGON", srid=4326))
+        # Ближе к центру вьюпорта — раньше, чтобы при limit обрезались окраины
+        center = make_point((min_lat + max_lat) / 2, (min_lon + max_lon) / 2)
+        result = await self.db.execute(
+            select(Store)
+            .where(Store.location.op("&&")(envelope))
+            .order_by(Store.location.op("<->")(center))
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def _load_hits(self, hits: List[Tuple[UUID, float]]) -> List[Tuple[Store, float]]:
+        stores = await self.loader.load_many([store_id for store_id, _ in hits])
+        # Магазин мог быть удалён другим воркером до ближайшей сверки индекса
+        return [(store, distance) for store, (_, distance) in zip(stores, hits) if store is not None]
+
+    async def get_clusters(self, zoom: int, tiles: List[Tuple[int, int]]) -> List[dict]:
+        found, missing = store_cluster_cache.get_many([(zoom, x, y) for x, y in tiles])
+        if missing:
+            epoch = store_cluster_cache.epoch
+            computed = await self._compute_tile_clusters(zoom, [(x, y) for _, x, y in missing])
+            for key in missing:
+                clusters = computed.get(key[1:], [])
+                store_cluster_cache.set(key, clusters, epoch)
+                found[key] = clusters
+        return [cluster for clusters in found.values() for cluster in clusters]
+
+    async def _compute_tile_clusters(self, zoom: int, tiles: List[Tuple[int, int]]) -> dict:
+        # Одним запросом по общей рамке недостающих тайлов; ячейка сетки — это
+        # тайл зума zoom + CLUSTER_GRID_BITS, поэтому тайл ячейки получается сдвигом.
+        bounds = [tile_bounds(x, y, zoom) for x, y in tiles]
+        n = 1 << (zoom + CLUSTER_GRID_BITS)
+        latitude = func.least(func.greatest(Store.latitude, -MAX_LATITUDE), MAX_LATITUDE)
+        lat_rad = func.radians(latitude, type_=Float)
+        mercator = func.ln(func.tan(lat_rad, type_=Float) + 1 / func.cos(lat_rad, type_=Float), type_=Float)
+        cell_x = func.least(func.floor((Store.longitude + 180.0) / 360.0 * n), n - 1)
+        cell_y = func.least(func.floor((1 - mercator / func.pi(type_=Float)) / 2.0 * n), n - 1)
+        sample = func.array_agg(
+            aggregate_order_by(Store.store_id, Store.store_id), type_=ARRAY(PG_UUID(as_uuid=True))
+        )[1:CLUSTER_SAMPLE_SIZE]
+        result = await self.db.execute(
+            select(
+                cell_x.label("cell_x"),
+                cell_y.label("cell_y"),
+                func.count().label("count"),
+                func.avg(Store.latitude).label("latitude"),
+                func.avg(Store.longitude).label("longitude"),
+                sample.label("store_ids"),
+            )
+            .where(
+                Store.longitude.between(min(b[0] for b in bounds), max(b[2] for b in bounds)),
+                Store.latitude.between(min(b[1] for b in bounds), max(b[3] for b in bounds)),
+            )
+            .group_by("cell_x", "cell_y")
+        )
+
+        wanted = set(tiles)
+        clusters: dict = {}
+        for row in result.all():
+            tile = (int(row.cell_x) >> CLUSTER_GRID_BITS, int(row.cell_y) >> CLUSTER_GRID_BITS)
+            if tile in wanted:
+                clusters.setdefault(tile, []).append({
+                    "latitude": float(row.latitude),
+                    "longitude": float(row.longitude),
+                    "count": row.count,
+                    "store_ids": list(row.store_ids),
+                })
+        return clusters
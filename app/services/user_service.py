@@ -1,8 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import String, bindparam, func, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 
 from app.models.users import Users
-from datetime import datetime
+from app.utils.user_cache import user_cache
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
 from loguru import logger
 
 class UserService:
@@ -28,5 +33,41 @@ class UserService:
             logger.info(f"Updating existing user: {user.id}")
             user.vk_json = vk_json
             await self.db.commit()
+            await user_cache.invalidate(user.id)
             logger.debug("User vk_json updated")
-            return user.id
\ No newline at end of file
+            return user.id
+
+    async def get_stale_vk_users(self, stale_after: timedelta, after_id: Optional[UUID], limit: int) -> List[Tuple[UUID, str]]:
+        """Пользователи VK, чей профиль не обновлялся дольше stale_after, по возрастанию id."""
+        query = (
+            select(Users.id, Users.vk_id)
+            .where(Users.vk_id.is_not(None), Users.updated_at < func.now() - stale_after)
+            .order_by(Users.id)
+            .limit(limit)
+        )
+        if after_id is not None:
+            query = query.where(Users.id > after_id)
+        return list((await self.db.execute(query)).all())
+
+    async def bulk_update_vk_json(self, profiles: Dict[str, str]) -> int:
+        """Записывает vk_json пачки пользователей одним UPDATE ... FROM unnest(...).
+
+        Обновлённые пользователи сбрасываются из кэша во всех воркерах.
+        """
+        if not profiles:
+            return 0
+        rows = select(
+            func.unnest(bindparam("vk_ids", list(profiles), type_=ARRAY(String))).label("vk_id"),
+            func.unnest(bindparam("vk_jsons", list(profiles.values()), type_=ARRAY(JSONB))).label("vk_json"),
+        ).subquery()
+        result = await self.db.execute(
+            update(Users)
+            .where(Users.vk_id == rows.c.vk_id)
+            .values(vk_json=rows.c.vk_json, updated_at=func.now())
+            .returning(Users.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated_ids = list(result.scalars().all())
+        await self.db.commit()
+        await user_cache.invalidate_many(updated_ids)
+        return len(updated_ids)
@@ -0,0 +1,213 @@
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+
+def haversine(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    lat1 = math.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlon = np.radians(lons - lon)
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GeoIndex:
+    """Сетка (cell_degrees x cell_degrees) поверх NumPy-массивов координат.
+
+    Точки лежат в массивах по слотам, ячейка сетки хранит номера слотов.
+    Запрос перебирает только ячейки, которые может задеть радиус, и считает
+    haversine векторно по кандидатам. Переход через антимеридиан не обрабатывается.
+    """
+
+    def __init__(self, cell_degrees: float = 0.05, initial_capacity: int = 1024):
+        self.cell_degrees = cell_degrees
+        self.ready = False
+        self.built_at: Optional[float] = None
+        self._reset(initial_capacity)
+
+    def _reset(self, capacity: int):
+        self._lat = np.empty(capacity, dtype=np.float64)
+        self._lon = np.empty(capacity, dtype=np.float64)
+        self._keys: List[Any] = [None] * capacity
+        self._slots: Dict[Any, int] = {}
+        self._free: List[int] = []
+        self._size = 0
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key) -> bool:
+        return key in self._slots
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def _grow(self):
+        capacity = len(self._lat) * 2
+        self._lat = np.resize(self._lat, capacity)
+        self._lon = np.resize(self._lon, capacity)
+        self._keys.extend([None] * (capacity - len(self._keys)))
+
+    def build(self, points: Iterable[Tuple[Any, float, float]]):
+        self._reset(len(self._lat))
+        for key, lat, lon in points:
+            self.upsert(key, lat, lon)
+        self.ready = True
+        self.built_at = time.time()
+
+    def upsert(self, key, lat: float, lon: float):
+        slot = self._slots.get(key)
+        if slot is not None:
+            old_cell = self._cell(self._lat[slot], self._lon[slot])
+            new_cell = self._cell(lat, lon)
+            self._lat[slot] = lat
+            self._lon[slot] = lon
+            if old_cell != new_cell:
+                self._cells[old_cell].remove(slot)
+                if not self._cells[old_cell]:
+                    del self._cells[old_cell]
+                self._cells.setdefault(new_cell, []).append(slot)
+            return
+
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self._size == len(self._lat):
+                self._grow()
+            slot = self._size
+            self._size += 1
+        self._lat[slot] = lat
+        self._lon[slot] = lon
+        self._keys[slot] = key
+        self._slots[key] = slot
+        self._cells.setdefault(self._cell(lat, lon), []).append(slot)
+
+    def remove(self, key) -> bool:
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return False
+        cell = self._cell(self._lat[slot], self._lon[slot])
+        self._cells[cell].remove(slot)
+        if not self._cells[cell]:
+            del self._cells[cell]
+        self._keys[slot] = None
+        self._free.append(slot)
+        return True
+
+    def _lon_cells(self, lat_from: float, lat_to: float, meters: float) -> int:
+        # Ширина ячейки по долготе сужается к полюсам — берём худшую широту диапазона
+        max_abs_lat = min(max(abs(lat_from), abs(lat_to)), 89.0)
+        lon_meters = self.cell_degrees * METERS_PER_DEGREE * math.cos(math.radians(max_abs_lat))
+        return math.ceil(meters / lon_meters)
+
+    def _candidates(self, cells: Iterable[Tuple[int, int]]) -> np.ndarray:
+        slots: List[int] = []
+        for cell in cells:
+            bucket = self._cells.get(cell)
+            if bucket:
+                slots.extend(bucket)
+        return np.fromiter(slots, dtype=np.intp, count=len(slots))
+
+    def _scored(self, lat: float, lon: float, slots: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return slots, haversine(lat, lon, self._lat[slots], self._lon[slots])
+
+    def within(self, lat: float, lon: float, radius: float, limit: Optional[int] = None) -> List[Tuple[Any, float]]:
+        """Точки в радиусе radius метров, от ближней к дальней."""
+        cell_lat, cell_lon = self._cell(lat, lon)
+        lat_cells = math.ceil(radius / (self.cell_degrees * METERS_PER_DEGREE))
+        span_lat = lat_cells * self.cell_degrees
+        lon_cells = self._lon_cells(lat - span_lat, lat + span_lat, radius)
+        if (2 * lat_cells + 1) * (2 * lon_cells + 1) > len(self._cells):
+            slots = np.fromiter(self._slots.values(), dtype=np.intp, count=len(self._slots))
+        else:
+            slots = self._candidates(
+                (cell_lat + dy, cell_lon + dx)
+                for dy in range(-lat_cells, lat_cells + 1)
+                for dx in range(-lon_cells, lon_cells + 1)
+            )
+        slots, distances = self._scored(lat, lon, slots)
+        mask = distances <= radius
+        return self._ordered(slots[mask], distances[mask], limit)
+
+    def nearest(self, lat: float, lon: float, k: int, max_distance: Optional[float] = None) -> List[Tuple[Any, float]]:
+        """k ближайших точек (опционально не дальше max_distance метров)."""
+        if k <= 0 or not self._slots:
+            return []
+        cell_lat, cell_lon = self._cell(lat, lon)
+        cell_meters = self.cell_degrees * METERS_PER_DEGREE
+        found: List[int] = []
+        ring = 0
+        prev_lon_ring = -1
+        # Расширяем квадрат ячеек кольцами, пока k-я точка не окажется ближе
+        # гарантированно просмотренного радиуса; если колец стало больше, чем
+        # непустых ячеек, дешевле посчитать всё разом.
+        while True:
+            covered = ring * cell_meters
+            lon_ring = self._lon_cells(lat - ring * self.cell_degrees, lat + ring * self.cell_degrees, covered)
+            if (2 * ring + 1) * (2 * lon_ring + 1) > len(self._cells):
+                slots = np.fromiter(self._slots.values(), dtype=np.intp, count=len(self._slots))
+                break
+            found.extend(self._candidates(
+                (cell_lat + dy, cell_lon + dx)
+                for dy in range(-ring, ring + 1)
+                for dx in range(-lon_ring, lon_ring + 1)
+                if abs(dy) == ring or abs(dx) > prev_lon_ring
+            ).tolist())
+            prev_lon_ring = lon_ring
+            slots = np.asarray(found, dtype=np.intp)
+            if max_distance is not None and covered >= max_distance:
+                break
+            if len(found) >= k:
+                _, distances = self._scored(lat, lon, slots)
+                if np.partition(distances, k - 1)[k - 1] <= covered:
+                    break
+            ring += 1
+
+        slots, distances = self._scored(lat, lon, slots)
+        if max_distance is not None:
+            mask = distances <= max_distance
+            slots, distances = slots[mask], distances[mask]
+        return self._ordered(slots, distances, k)
+
+    def in_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float, limit: Optional[int] = None) -> List[Tuple[Any, float]]:
+        """Точки в прямоугольнике, от центра к краям."""
+        lat_from, lon_from = self._cell(min_lat, min_lon)
+        lat_to, lon_to = self._cell(max_lat, max_lon)
+        if (lat_to - lat_from + 1) * (lon_to - lon_from + 1) > len(self._cells):
+            slots = np.fromiter(self._slots.values(), dtype=np.intp, count=len(self._slots))
+        else:
+            slots = self._candidates(
+                (y, x) for y in range(lat_from, lat_to + 1) for x in range(lon_from, lon_to + 1)
+            )
+        lats, lons = self._lat[slots], self._lon[slots]
+        mask = (lats >= min_lat) & (lats <= max_lat) & (lons >= min_lon) & (lons <= max_lon)
+        slots, distances = self._scored((min_lat + max_lat) / 2, (min_lon + max_lon) / 2, slots[mask])
+        return self._ordered(slots, distances, limit)
+
+    def _ordered(self, slots: np.ndarray, distances: np.ndarray, limit: Optional[int]) -> List[Tuple[Any, float]]:
+        if limit is not None and len(distances) > limit:
+            top = np.argpartition(distances, limit - 1)[:limit]
+            slots, distances = slots[top], distances[top]
+        order = np.argsort(distances, kind="stable")
+        return [(self._keys[slots[i]], float(distances[i])) for i in order]
+
+    def diff(self, points: Iterable[Tuple[Any, float, float]]) -> Dict[str, int]:
+        """Сверка с эталонным набором точек: чего не хватает, что лишнее, что сдвинуто."""
+        missing = moved = 0
+        seen = set()
+        for key, lat, lon in points:
+            seen.add(key)
+            slot = self._slots.get(key)
+            if slot is None:
+                missing += 1
+            elif self._lat[slot] != lat or self._lon[slot] != lon:
+                moved += 1
+        extra = sum(1 for key in self._slots if key not in seen)
+        return {"missing": missing, "extra": extra, "moved": moved}
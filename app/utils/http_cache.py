@@ -0,0 +1,49 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+# Публичный каталог: клиенту и CDN можно недолго отдавать своё, потом перепроверять
+CATALOG_CACHE_CONTROL = "public, max-age=30, stale-while-revalidate=60"
+# Данные за авторизацией: хранить можно только на клиенте и перепроверять каждый раз
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def body_etag(body: bytes) -> str:
+    """ETag готового тела ответа — для ответов из кэша, которые без БД версию не узнают.
+
+    Пересборка тела меняет presigned-ссылки на фото, поэтому по 304 клиент не
+    удержит ссылки старше TTL кэша ответов.
+    """
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Для If-None-Match сравнение слабое: W/"x" совпадает с "x"
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def cache_headers(etag: str, cache_control: str) -> dict:
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag, cache_control))
+
+
+def conditional_response(request: Request, etag: str, cache_control: str) -> Optional[Response]:
+    """304, если у клиента актуальная версия, иначе None — тогда собираем тело."""
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+    return None
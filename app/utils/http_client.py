@@ -0,0 +1,79 @@
+import asyncio
+import random
+from typing import Optional
+
+import httpx
+from loguru import logger
+
+from app.core.config import HttpClientSettings
+
+try:
+    import h2  # noqa: F401
+except ImportError:  # без h2 httpx умеет только HTTP/1.1
+    h2 = None
+
+# Ответы, после которых повтор имеет смысл: сервер не обработал запрос
+RETRY_STATUS_CODES = {502, 503, 504}
+# Ошибки до отправки запроса — их можно повторять даже для неидемпотентных вызовов
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+_settings: Optional[HttpClientSettings] = None
+_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client_settings() -> HttpClientSettings:
+    global _settings
+    if _settings is None:
+        _settings = HttpClientSettings()
+    return _settings
+
+def get_http_client() -> httpx.AsyncClient:
+    """Общий httpx-клиент процесса: keep-alive соединения к VK живут между логинами."""
+    global _client
+    if _client is None:
+        settings = get_http_client_settings()
+        _client = httpx.AsyncClient(
+            http2=settings.http2_enabled and h2 is not None,
+            timeout=httpx.Timeout(
+                connect=settings.http_connect_timeout,
+                read=settings.http_read_timeout,
+                write=settings.http_read_timeout,
+                pool=settings.http_pool_timeout,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry,
+            ),
+        )
+    return _client
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def request_with_retries(method: str, url: str, idempotent: bool = True, **kwargs) -> httpx.Response:
+    """Запрос через общий клиент с ограниченным числом повторов и full jitter.
+
+    Неидемпотентные запросы (обмен одноразового кода на токен) повторяются
+    только если запрос точно не ушёл на сервер.
+    """
+    settings = get_http_client_settings()
+    retryable = httpx.TransportError if idempotent else NOT_SENT_ERRORS
+    attempt = 0
+    while True:
+        try:
+            response = await get_http_client().request(method, url, **kwargs)
+            if not idempotent or response.status_code not in RETRY_STATUS_CODES or attempt >= settings.http_retries:
+                return response
+            reason = f"status {response.status_code}"
+        except retryable as e:
+            if attempt >= settings.http_retries:
+                raise
+            reason = repr(e)
+        attempt += 1
+        delay = random.uniform(0, settings.http_retry_backoff * 2 ** (attempt - 1))
+        logger.warning(f"{method} {url} failed ({reason}), retry {attempt}/{settings.http_retries} in {delay:.2f}s")
+        await asyncio.sleep(delay)
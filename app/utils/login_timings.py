@@ -0,0 +1,54 @@
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+# Этапы VK-логина в порядке выполнения
+LOGIN_STAGES = ("redis", "token_exchange", "users_get", "db", "jwt")
+
+
+class StageTimings:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.seconds_total = 0.0
+        self.seconds_max = 0.0
+
+    def record(self, seconds: float, failed: bool):
+        self.count += 1
+        if failed:
+            self.errors += 1
+        self.seconds_total += seconds
+        if seconds > self.seconds_max:
+            self.seconds_max = seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "seconds_total": round(self.seconds_total, 6),
+            "seconds_max": round(self.seconds_max, 6),
+            "seconds_avg": round(self.seconds_total / self.count, 6) if self.count else 0.0,
+        }
+
+
+class LoginTimings:
+    """Время VK-логина по этапам, чтобы было видно, кто именно тормозит."""
+
+    def __init__(self):
+        self.stages: Dict[str, StageTimings] = {stage: StageTimings() for stage in LOGIN_STAGES}
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self.stages[name].record(time.perf_counter() - started, failed)
+
+    def get_stats(self) -> dict:
+        return {name: stats.as_dict() for name, stats in self.stages.items()}
+
+
+login_timings = LoginTimings()
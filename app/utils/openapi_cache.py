@@ -0,0 +1,92 @@
+import gzip
+import hashlib
+import json
+from typing import Dict, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.openapi.utils import get_openapi
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен, без него отдаём gzip
+    brotli = None
+
+
+# Порядок предпочтения сервера при равных q
+PREFERRED_ENCODINGS = ("br", "gzip")
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Кодировка -> q из Accept-Encoding; без q считается 1, кривой q — 0."""
+    accepted = {}
+    for part in header.split(","):
+        coding, *params = (item.strip() for item in part.split(";"))
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+
+class OpenAPICache:
+    """Схема OpenAPI, собранная один раз и хранящаяся готовыми байтами.
+
+    Пересобирается, только если изменился набор маршрутов приложения.
+    """
+
+    def __init__(self):
+        self._fingerprint: Optional[Tuple[int, ...]] = None
+        self._variants: Dict[str, bytes] = {}
+        self._etag: Optional[str] = None
+        self.builds = 0
+
+    @staticmethod
+    def _routes_fingerprint(app: FastAPI) -> Tuple[int, ...]:
+        return tuple(id(route) for route in app.routes)
+
+    def _build(self, app: FastAPI, fingerprint: Tuple[int, ...]):
+        schema = get_openapi(
+            title=app.title,
+            version=app.version,
+            description=app.description,
+            routes=app.routes,
+        )
+        body = json.dumps(schema, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+        variants = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants["br"] = brotli.compress(body, quality=11)
+        self._variants = variants
+        self._etag = hashlib.sha1(body).hexdigest()
+        self._fingerprint = fingerprint
+        self.builds += 1
+
+    def warm(self, app: FastAPI):
+        fingerprint = self._routes_fingerprint(app)
+        if fingerprint != self._fingerprint:
+            self._build(app, fingerprint)
+
+    def get(self, request: Request) -> Tuple[bytes, Optional[str], str]:
+        """(тело, Content-Encoding или None, ETag) под Accept-Encoding клиента."""
+        self.warm(request.app)
+        accepted = parse_accept_encoding(request.headers.get("accept-encoding", ""))
+        best, best_q = None, 0.0
+        for encoding in PREFERRED_ENCODINGS:
+            # q=0 — явный отказ; "*" относится ко всем не перечисленным кодировкам
+            q = accepted.get(encoding, accepted.get("*", 0.0))
+            if encoding in self._variants and q > best_q:
+                best, best_q = encoding, q
+        # Без сжатия можно всегда, но если клиент явно предпочёл identity — уважаем это
+        if best is not None and accepted.get("identity", 0.0) <= best_q:
+            # У каждого представления свой сильный ETag
+            return self._variants[best], best, f'"{self._etag}-{best}"'
+        return self._variants["identity"], None, f'"{self._etag}"'
+
+
+openapi_cache = OpenAPICache()
@@ -0,0 +1,159 @@
+import math
+import time
+from typing import Dict, Tuple
+
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, Request, status
+from loguru import logger
+from redis.exceptions import RedisError
+
+from app.core.config import RateLimitSettings
+from app.db.redis import get_redis
+from app.models.users import Users
+from app.utils.security import get_current_user
+
+# Token bucket: корзина ёмкостью capacity пополняется rate токенов в секунду,
+# каждый запрос забирает один. Время берётся из Redis, чтобы часы воркеров
+# не влияли на результат; скрипт атомарен, гонок между воркерами нет.
+TOKEN_BUCKET_LUA = """
+if redis.replicate_commands then redis.replicate_commands() end
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RateLimitRule:
+    def __init__(self, spec: str):
+        capacity, period = spec.split("/")
+        self.capacity = int(capacity)
+        self.period = float(period)
+        if self.capacity < 1 or self.period <= 0:
+            raise ValueError(f"Rate limit rule {spec!r} needs capacity >= 1 and a positive period")
+        self.rate = self.capacity / self.period
+
+
+class RateLimitStats:
+    def __init__(self):
+        self.allowed = 0
+        self.rejected = 0
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+class RateLimiter:
+    """Ограничитель частоты запросов на Redis, общий для всех воркеров.
+
+    Если Redis недоступен, считает по локальным корзинам воркера: лимит
+    становится помягче (по корзине на процесс), но не пропадает совсем.
+    """
+
+    def __init__(self, settings: RateLimitSettings):
+        self.settings = settings
+        self.rules: Dict[str, RateLimitRule] = {}
+        self.stats: Dict[str, RateLimitStats] = {}
+        self.fallbacks = 0
+        self._local: TTLCache = TTLCache(maxsize=settings.rate_limit_local_maxsize, ttl=3600)
+        self._script = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.rate_limit_enabled
+
+    def rule(self, name: str) -> RateLimitRule:
+        rule = self.rules.get(name)
+        if rule is None:
+            rule = self.rules[name] = RateLimitRule(getattr(self.settings, f"rate_limit_{name}"))
+            self.stats[name] = RateLimitStats()
+        return rule
+
+    async def _take_redis(self, key: str, rule: RateLimitRule) -> Tuple[bool, float]:
+        redis = get_redis()
+        if self._script is None:
+            self._script = redis.register_script(TOKEN_BUCKET_LUA)
+        allowed, retry_after = await self._script(keys=[key], args=[rule.capacity, rule.rate], client=redis)
+        return bool(allowed), float(retry_after)
+
+    def _take_local(self, key: str, rule: RateLimitRule) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, ts = self._local.get(key, (rule.capacity, now))
+        tokens = min(rule.capacity, tokens + (now - ts) * rule.rate)
+        if tokens >= 1:
+            self._local[key] = (tokens - 1, now)
+            return True, 0.0
+        self._local[key] = (tokens, now)
+        return False, (1 - tokens) / rule.rate
+
+    async def check(self, name: str, identity: str):
+        if not self.enabled:
+            return
+        rule = self.rule(name)
+        key = f"ratelimit:{name}:{identity}"
+        try:
+            allowed, retry_after = await self._take_redis(key, rule)
+        except RedisError as e:
+            self.fallbacks += 1
+            logger.warning(f"Rate limiter falls back to local buckets: {e}")
+            allowed, retry_after = self._take_local(key, rule)
+
+        stats = self.stats[name]
+        if allowed:
+            stats.allowed += 1
+            return
+        stats.rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "fallbacks": self.fallbacks,
+            "rules": {name: stats.as_dict() for name, stats in self.stats.items()},
+        }
+
+
+rate_limiter = RateLimiter(RateLimitSettings())
+
+
+def client_ip(request: Request) -> str:
+    # За nginx это адрес из X-Forwarded-For: uvicorn запущен с --proxy-headers
+    # и доверяет заголовку только от прокси (--forwarded-allow-ips, см. docker-compose)
+    return request.client.host if request.client else "unknown"
+
+def rate_limit(name: str, per_user: bool = False):
+    """Зависимость маршрута: лимит name из RateLimitSettings по пользователю или IP."""
+    # Неизвестное правило или кривая строка в .env должны ронять старт, а не первый запрос
+    rate_limiter.rule(name)
+
+    if per_user:
+        async def limit_by_user(current_user: Users = Depends(get_current_user)):
+            await rate_limiter.check(name, f"user:{current_user.id}")
+        return limit_by_user
+
+    async def limit_by_ip(request: Request):
+        await rate_limiter.check(name, f"ip:{client_ip(request)}")
+    return limit_by_ip
@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import uuid
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from loguru import logger
+from redis.exceptions import RedisError
+
+from app.core.config import ResponseCacheSettings
+from app.db.redis import get_redis
+
+_settings = None
+
+def get_response_cache_settings() -> ResponseCacheSettings:
+    global _settings
+    if _settings is None:
+        _settings = ResponseCacheSettings()
+    return _settings
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.coalesced = 0
+        self.lock_waits = 0
+        self.errors = 0
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+class ResponseCache:
+    """Готовые JSON-ответы в Redis.
+
+    Запись хранится как b"<поколение>:<тело>". Инвалидация записывает в ключ
+    поколения новое случайное значение, поэтому она O(1) и не гоняется с
+    пересчётом: ответ, собранный до записи, помечен старым поколением и при
+    чтении считается промахом.
+    Пересчёт одного ключа выполняется один раз: внутри процесса ожидающие
+    подписываются на общий future, между процессами — Redis-лок.
+    """
+
+    LOCK_POLL_INTERVAL = 0.05
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self.stats = CacheStats()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def key(self, *parts: str) -> str:
+        return f"cache:{self.namespace}:" + ":".join(parts)
+
+    def gen_key(self, *parts: str) -> str:
+        return f"cache:{self.namespace}:gen:" + ":".join(parts)
+
+    @staticmethod
+    def query_hash(path: str, query_items: Iterable[Tuple[str, str]]) -> str:
+        normalized = path + "?" + "&".join(f"{k}={v}" for k, v in sorted(query_items))
+        return hashlib.sha1(normalized.encode()).hexdigest()
+
+    async def _read(self, key: str, gen_key: str) -> Tuple[Optional[bytes], bytes, bool]:
+        """(тело или None, текущее поколение, была ли запись устаревшей)."""
+        entry, gen = await get_redis().mget(key, gen_key)
+        gen = gen or b"0"
+        if entry is None:
+            return None, gen, False
+        entry_gen, _, body = entry.partition(b":")
+        if entry_gen != gen:
+            return None, gen, True
+        return body, gen, False
+
+    async def get_or_set(self, key: str, gen_key: str, produce: Callable[[], Awaitable[bytes]]) -> bytes:
+        settings = get_response_cache_settings()
+        if not settings.response_cache_enabled:
+            return await produce()
+
+        try:
+            body, gen, stale = await self._read(key, gen_key)
+        except RedisError as e:
+            self.stats.errors += 1
+            logger.warning(f"Response cache read failed for {key}: {e}")
+            return await produce()
+        if body is not None:
+            self.stats.hits += 1
+            return body
+        self.stats.misses += 1
+        if stale:
+            self.stats.stale += 1
+
+        while True:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            self.stats.coalesced += 1
+            # wait не отменяет общий future и не пробрасывает его отмену. Если отменили
+            # запрос, который собирал ответ (клиент ушёл), ожидающий соберёт его сам:
+            # produce привязан к сессии того запроса, доделать за него нельзя
+            await asyncio.wait({inflight})
+            if not inflight.cancelled():
+                return inflight.result()
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            body = await self._fill(key, gen_key, gen, produce, settings)
+            future.set_result(body)
+            return body
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Ошибку уже получат ожидающие, а не только текущий запрос
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _fill(self, key: str, gen_key: str, gen: bytes, produce, settings: ResponseCacheSettings) -> bytes:
+        redis = get_redis()
+        lock = redis.lock(f"{key}:lock", timeout=settings.response_cache_lock_timeout)
+        try:
+            acquired = await lock.acquire(blocking=False)
+        except RedisError as e:
+            self.stats.errors += 1
+            logger.warning(f"Response cache lock failed for {key}: {e}")
+            return await produce()
+
+        if not acquired:
+            # Ответ уже собирает другой воркер — ждём его, но не дольше таймаута лока
+            self.stats.lock_waits += 1
+            deadline = asyncio.get_running_loop().time() + settings.response_cache_lock_timeout
+            while asyncio.get_running_loop().time() < deadline:
+                await asyncio.sleep(self.LOCK_POLL_INTERVAL)
+                try:
+                    body, _, _ = await self._read(key, gen_key)
+                except RedisError:
+                    break
+                if body is not None:
+                    return body
+            return await produce()
+
+        try:
+            body = await produce()
+            try:
+                await redis.set(key, gen + b":" + body, ex=settings.response_cache_ttl)
+            except RedisError as e:
+                self.stats.errors += 1
+                logger.warning(f"Response cache write failed for {key}: {e}")
+            return body
+        finally:
+            try:
+                await lock.release()
+            except Exception:
+                pass
+
+    async def invalidate(self, *gen_keys: str):
+        settings = get_response_cache_settings()
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                for gen_key in gen_keys:
+                    # Случайное, а не INCR: после истечения ключа счётчик начал бы
+                    # заново и мог совпасть с поколением ещё живой записи.
+                    # Ключ живёт дольше любой записи, помеченной прошлым поколением.
+                    pipe.set(gen_key, uuid.uuid4().hex, ex=settings.response_cache_ttl * 2)
+                await pipe.execute()
+        except RedisError as e:
+            self.stats.errors += 1
+            logger.error(f"Response cache invalidation failed for {gen_keys}: {e}")
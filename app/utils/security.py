@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta
+import uuid
 
 from fastapi import Depends, HTTPException, status
 from fastapi import Request
@@ -11,6 +12,7 @@ from app.core.config import JWTSettings
 from app.db.database import get_db
 from app.models.users import Users
 from app.schemas.token import Token  
+from app.utils.user_cache import user_cache
 
 auth_scheme = APIKeyHeader(name="Authorization", scheme_name="Bearer", auto_error=False)
 
@@ -90,13 +92,24 @@ async def get_current_user(request: Request, token: str = Depends(auth_scheme),
             raise credentials_exception
         if payload.get("type") != "access":
             raise credentials_exception
+        user_id = uuid.UUID(str(id))
     except Exception:
         raise credentials_exception
+    # По нему ReadYourWritesMiddleware закрепляет чтения пользователя за primary после записи
+    request.state.user_id = user_id
     
-    result = await db.execute(select(Users).where(Users.id == id))
+    if user_cache.enabled:
+        user = user_cache.get(user_id)
+        if user is not None:
+            return user
+        epoch = user_cache.epoch
+    
+    result = await db.execute(select(Users).where(Users.id == user_id))
     user = result.scalar_one_or_none()
     
     if user is None:
         raise credentials_exception
     
+    if user_cache.enabled:
+        user_cache.put(user, epoch)
     return user
\ No newline at end of file
@@ -0,0 +1,38 @@
+import math
+from typing import List, Tuple
+
+MAX_ZOOM = 20
+MAX_LATITUDE = 85.05112878
+
+
+def tile_x(lon: float, zoom: int) -> int:
+    n = 1 << zoom
+    return min(max(int((lon + 180.0) / 360.0 * n), 0), n - 1)
+
+
+def tile_y(lat: float, zoom: int) -> int:
+    n = 1 << zoom
+    lat_rad = math.radians(min(max(lat, -MAX_LATITUDE), MAX_LATITUDE))
+    y = (1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi) / 2.0 * n
+    return min(max(int(y), 0), n - 1)
+
+
+def tile_for(lat: float, lon: float, zoom: int) -> Tuple[int, int]:
+    return tile_x(lon, zoom), tile_y(lat, zoom)
+
+
+def tile_bounds(x: int, y: int, zoom: int) -> Tuple[float, float, float, float]:
+    """(min_lon, min_lat, max_lon, max_lat) тайла в веб-меркаторе."""
+    n = 1 << zoom
+
+    def lat(row: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)
+
+
+def tiles_in_bbox(min_lon: float, min_lat: float, max_lon: float, max_lat: float, zoom: int) -> List[Tuple[int, int]]:
+    x_from, x_to = tile_x(min_lon, zoom), tile_x(max_lon, zoom)
+    # Ось y тайлов направлена на юг
+    y_from, y_to = tile_y(max_lat, zoom), tile_y(min_lat, zoom)
+    return [(x, y) for x in range(x_from, x_to + 1) for y in range(y_from, y_to + 1)]
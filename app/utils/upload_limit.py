@@ -0,0 +1,63 @@
+from fastapi import HTTPException, status
+from starlette.responses import JSONResponse
+
+
+class UploadSizeLimitMiddleware:
+    """Ограничивает тело multipart-запроса до того, как Starlette разберёт его во временные файлы.
+
+    Запрос с Content-Length больше лимита отклоняется сразу, не читая тела.
+    Тело без Content-Length (chunked) считается по мере чтения: на превышении
+    разбор формы прерывается с 413, и дальше лимита на диск ничего не пишется.
+    """
+
+    def __init__(self, app, max_size: int):
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = self._header(scope, b"content-length")
+        if content_length is not None:
+            try:
+                too_large = int(content_length) > self.max_size
+            except ValueError:
+                too_large = False
+            if too_large:
+                response = JSONResponse(
+                    {"detail": f"Request body is too large, maximum is {self.max_size} bytes"},
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    headers={"Connection": "close"},
+                )
+                await response(scope, receive, send)
+                return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_size:
+                    # FastAPI пробрасывает HTTPException из разбора формы как есть
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Request body is too large, maximum is {self.max_size} bytes",
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    @staticmethod
+    def _header(scope, name: bytes):
+        for key, value in scope.get("headers", []):
+            if key == name:
+                return value.decode("latin-1")
+        return None
+
+    def _is_multipart(self, scope) -> bool:
+        content_type = self._header(scope, b"content-type") or ""
+        return content_type.lower().startswith("multipart/form-data")
@@ -0,0 +1,135 @@
+import asyncio
+import uuid
+from typing import Optional
+
+from cachetools import TTLCache
+from loguru import logger
+from redis.exceptions import RedisError
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import UserCacheSettings
+from app.db.redis import get_pubsub_redis, get_redis
+from app.models.users import Users
+
+user_cache_settings = UserCacheSettings()
+
+
+def _detached_copy(user: Users) -> Users:
+    # Копия не привязана ни к одной сессии, поэтому её можно отдавать
+    # параллельным запросам; для merge(load=False) у неё есть identity key.
+    copy = Users(**{column.key: getattr(user, column.key) for column in Users.__table__.columns})
+    make_transient_to_detached(copy)
+    return copy
+
+
+class UserCache:
+    """TTL+LRU кэш пользователей процесса для get_current_user.
+
+    Изменения пользователя рассылаются через Redis pub/sub, так что остальные
+    воркеры сбрасывают запись сразу; TTL ограничивает устаревание, если
+    сообщение потерялось.
+    """
+
+    RECONNECT_DELAY = 1.0
+    MAX_RECONNECT_DELAY = 30.0
+
+    def __init__(self, settings: UserCacheSettings):
+        self.settings = settings
+        self._cache: TTLCache = TTLCache(maxsize=settings.user_cache_maxsize, ttl=settings.user_cache_ttl)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Растёт при каждой инвалидации: строка, прочитанная до неё, в кэш не попадает
+        self.epoch = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.user_cache_enabled
+
+    def get(self, user_id: uuid.UUID) -> Optional[Users]:
+        user = self._cache.get(user_id)
+        if user is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return user
+
+    def put(self, user: Users, epoch: int):
+        if epoch == self.epoch:
+            self._cache[user.id] = _detached_copy(user)
+
+    def discard(self, user_id: uuid.UUID):
+        self.epoch += 1
+        if self._cache.pop(user_id, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self.epoch += 1
+        self._cache.clear()
+
+    async def invalidate(self, user_id: uuid.UUID):
+        self.discard(user_id)
+        if not self.enabled:
+            return
+        try:
+            await get_redis().publish(self.settings.user_cache_channel, str(user_id))
+        except RedisError as e:
+            logger.warning(f"Failed to broadcast user cache invalidation for {user_id}: {e}")
+
+    async def invalidate_many(self, user_ids):
+        """Как invalidate, но для пачки: все публикации уходят одним pipeline."""
+        user_ids = list(user_ids)
+        for user_id in user_ids:
+            self.discard(user_id)
+        if not self.enabled or not user_ids:
+            return
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                for user_id in user_ids:
+                    pipe.publish(self.settings.user_cache_channel, str(user_id))
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Failed to broadcast user cache invalidation for {len(user_ids)} users: {e}")
+
+    async def listen(self):
+        delay = self.RECONNECT_DELAY
+        while True:
+            pubsub = get_pubsub_redis().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.settings.user_cache_channel)
+                delay = self.RECONNECT_DELAY
+                async for message in pubsub.listen():
+                    try:
+                        self.discard(uuid.UUID(message["data"].decode()))
+                    except (AttributeError, ValueError):
+                        continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Пока подписки нет, сообщения теряются — сбрасываем всё, чтобы не жить на устаревшем
+                self.clear()
+                logger.warning(f"User cache invalidation listener failed, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+user_cache = UserCache(user_cache_settings)
+
+def start_user_cache_listener() -> Optional[asyncio.Task]:
+    if not user_cache.enabled:
+        return None
+    return asyncio.create_task(user_cache.listen())
@@ -1,7 +1,7 @@
 import hashlib
 import hmac
-import httpx
 import json
+from typing import List
 
 from fastapi import Depends, HTTPException, status
 from fastapi.responses import PlainTextResponse
@@ -10,17 +10,30 @@ from sqlalchemy.ext.asyncio import AsyncSession
 import pkce 
 from app.core.config import VKSettings
 from app.db.database import get_db
+from app.utils.http_client import request_with_retries
+from app.utils.login_timings import login_timings
 from app.utils.security import create_access_token, create_refresh_token
 from app.services.pkce_service import PKCEService
 vk_auth_settings = VKSettings()
 pkce_service = PKCEService()
 
+VK_API_VERSION = "5.199"
+VK_USER_FIELDS = "first_name,last_name,photo_200,domain"
+VK_USERS_GET_MAX_IDS = 1000
+VK_ERROR_TOO_MANY_REQUESTS = 6
+
+
+class VKAPIError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(f"VK API error {code}: {message}")
+        self.code = code
+
 async def get_vk_user_info(access_token: str, user_id: int = None):
     vk_api_url = str(vk_auth_settings.vk_api_url)
     params = {
         "access_token": access_token,
-        "v": "5.199",
-        "fields": "first_name,last_name,photo_200,domain",
+        "v": VK_API_VERSION,
+        "fields": VK_USER_FIELDS,
     }
     
     if user_id:
@@ -28,18 +41,38 @@ async def get_vk_user_info(access_token: str, user_id: int = None):
     else:
         params["user_ids"] = ""
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(vk_api_url, params=params)
-        data = response.json()
-
-        if "error" in data:
-            error = data["error"]
-            raise HTTPException(
-                status_code=400,
-                detail=f"VK API error: {error.get('error_msg', 'Unknown error')}",
-            )
-
-        return data.get("response", [{}])[0]
+    response = await request_with_retries("GET", vk_api_url, params=params)
+    data = response.json()
+
+    if "error" in data:
+        error = data["error"]
+        raise HTTPException(
+            status_code=400,
+            detail=f"VK API error: {error.get('error_msg', 'Unknown error')}",
+        )
+
+    return data.get("response", [{}])[0]
+
+async def get_vk_users_info(vk_ids: List[str], access_token: str) -> List[dict]:
+    """users.get для пачки до VK_USERS_GET_MAX_IDS пользователей за один вызов."""
+    if len(vk_ids) > VK_USERS_GET_MAX_IDS:
+        raise ValueError(f"users.get accepts at most {VK_USERS_GET_MAX_IDS} ids")
+    # POST: тысяча id в query string упирается в лимит длины URL
+    response = await request_with_retries(
+        "POST",
+        str(vk_auth_settings.vk_api_url),
+        data={
+            "access_token": access_token,
+            "v": VK_API_VERSION,
+            "fields": VK_USER_FIELDS,
+            "user_ids": ",".join(vk_ids),
+        },
+    )
+    data = response.json()
+    if "error" in data:
+        error = data["error"]
+        raise VKAPIError(error.get("error_code", 0), error.get("error_msg", "Unknown error"))
+    return data.get("response", [])
 
 async def generate_auth_url() -> tuple[str,str]:
     code_verifier,code_challenge = pkce.generate_pkce_pair()
@@ -60,8 +93,9 @@ async def validate_callback(code: str, state: str, device_id: str = None) -> tup
     session_id = state  
     logger.debug("Derived session_id from state")
 
-    pkce_data = await pkce_service.get_pkce_pair(session_id)
-    logger.debug("PKCE data fetched from Redis: %s", bool(pkce_data))
+    with login_timings.stage("redis"):
+        pkce_data = await pkce_service.pop_pkce_pair(session_id)
+    logger.debug("PKCE data popped from Redis: %s", bool(pkce_data))
 
     if not pkce_data:
         logger.error("No PKCE data found for session")
@@ -70,11 +104,9 @@ async def validate_callback(code: str, state: str, device_id: str = None) -> tup
     code_verifier = pkce_data["verifier"]
     logger.debug("Extracted code_verifier")
 
-    await pkce_service.delete_pkce_pair(session_id)
-    logger.debug("Deleted PKCE pair from Redis")
-
     logger.debug("Calling exchange_code_for_token")
-    access_token, user_id = await exchange_code_for_token(code, code_verifier, device_id)
+    with login_timings.stage("token_exchange"):
+        access_token, user_id = await exchange_code_for_token(code, code_verifier, device_id)
     logger.info("VK token exchange succeeded")
     logger.debug("Got user_id from token: %s", user_id)
 
@@ -102,25 +134,25 @@ async def exchange_code_for_token(code: str, code_verifier: str, device_id: str
     safe_data = {k: ('***' if k in {"client_secret", "code", "device_id"} else v) for k, v in data.items()}
     logger.debug("Making request to VK with data: %s", safe_data)
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(token_url, headers=headers, data=data)
-        logger.debug("VK response status: %s", response.status_code)
-        
-        token_data = response.json()
-        logger.debug("VK token data keys: %s", list(token_data.keys()))
-        
-        access_token = token_data.get("access_token")
-        user_id = token_data.get("user_id")
-        
-        if not access_token:
-            error_msg = token_data.get("error", "Unknown error")
-            logger.error("No access token in VK response: %s", error_msg)
-            raise HTTPException(
-                status_code=400, detail=f"Invalid token response from VK: {error_msg}"
-            )
-        
-        logger.debug("Got user_id from VK response")
-        return access_token, user_id
+    # Код одноразовый: повторяем, только если запрос не дошёл до VK
+    response = await request_with_retries("POST", token_url, idempotent=False, headers=headers, data=data)
+    logger.debug("VK response status: %s", response.status_code)
+
+    token_data = response.json()
+    logger.debug("VK token data keys: %s", list(token_data.keys()))
+
+    access_token = token_data.get("access_token")
+    user_id = token_data.get("user_id")
+
+    if not access_token:
+        error_msg = token_data.get("error", "Unknown error")
+        logger.error("No access token in VK response: %s", error_msg)
+        raise HTTPException(
+            status_code=400, detail=f"Invalid token response from VK: {error_msg}"
+        )
+
+    logger.debug("Got user_id from VK response")
+    return access_token, user_id
 
 async def vk_auth(user_info, id, db: AsyncSession):
     credentials_exception = HTTPException(
@@ -0,0 +1,105 @@
+"""Остановки event loop во время PKCE-флоу: синхронный redis.Redis против PKCEService.
+
+    python -m benchmarks.pkce_event_loop_stall --redis-url redis://localhost:6379/0 --flows 2000 --concurrency 50
+
+Один flow — store_pkce_pair + pop. Параллельно тикает корутина с шагом
+--tick-ms и копит опоздания: сколько loop не мог её разбудить. Для
+синхронного клиента опоздание растёт на каждую команду, для асинхронного
+остаётся на уровне шума. Ключи pkce:* создаются и сразу удаляются.
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import numpy as np
+import redis
+from redis import asyncio as aioredis
+
+from app.services.pkce_service import PKCEService
+
+
+class SyncClientPKCE:
+    """Прежняя реализация: синхронный клиент внутри async def."""
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+
+    async def store_pkce_pair(self, code_verifier: str, code_challenge: str, ttl: int = 300) -> str:
+        session_id = str(uuid.uuid4())
+        self.client.setex(f"pkce:{session_id}", ttl, json.dumps({"verifier": code_verifier, "challenge": code_challenge}))
+        return session_id
+
+    async def pop_pkce_pair(self, session_id: str):
+        data = self.client.get(f"pkce:{session_id}")
+        self.client.delete(f"pkce:{session_id}")
+        return json.loads(data) if data else None
+
+
+async def _ticker(tick: float, lateness: list, stop: asyncio.Event):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + tick
+        await asyncio.sleep(tick)
+        lateness.append(max(loop.time() - expected, 0.0))
+
+
+async def _run(service, flows: int, concurrency: int, tick: float) -> dict:
+    lateness: list = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(tick, lateness, stop))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def flow():
+        async with semaphore:
+            session_id = await service.store_pkce_pair("verifier", "challenge")
+            assert await service.pop_pkce_pair(session_id) is not None
+
+    started = time.perf_counter()
+    await asyncio.gather(*(flow() for _ in range(flows)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+
+    stalls = np.array(lateness or [0.0]) * 1000
+    return {
+        "flows_per_s": flows / elapsed,
+        "stall_p50_ms": float(np.percentile(stalls, 50)),
+        "stall_p99_ms": float(np.percentile(stalls, 99)),
+        "stall_max_ms": float(stalls.max()),
+        "stall_total_ms": float(stalls.sum()),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--redis-url", default="redis://localhost:6379/0")
+    parser.add_argument("--flows", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--tick-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    sync_client = redis.Redis.from_url(args.redis_url)
+    async_client = aioredis.Redis(
+        connection_pool=aioredis.BlockingConnectionPool.from_url(args.redis_url, max_connections=args.concurrency)
+    )
+    cases = [
+        ("sync redis.Redis", SyncClientPKCE(sync_client)),
+        ("redis.asyncio + GETDEL", PKCEService(async_client)),
+    ]
+    try:
+        for name, service in cases:
+            result = await _run(service, args.flows, args.concurrency, args.tick_ms / 1000)
+            print(
+                f"{name:<24} {result['flows_per_s']:>9.0f} flows/s  "
+                f"stall p50 {result['stall_p50_ms']:.2f} ms  p99 {result['stall_p99_ms']:.2f} ms  "
+                f"max {result['stall_max_ms']:.2f} ms  total {result['stall_total_ms']:.0f} ms"
+            )
+    finally:
+        sync_client.close()
+        await async_client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+"""Всплеск загрузок в S3: общий executor против отдельного пула S3Service.
+
+    python -m benchmarks.s3_concurrency --uploads 200 --latency 0.05
+    python -m benchmarks.s3_concurrency --endpoint-url http://localhost:9000 --bucket bench
+
+Без --endpoint-url S3 заменяется заглушкой в процессе: put_object просто
+спит --latency секунд в потоке, как блокирующий сетевой вызов. Пока идёт
+всплеск, зонд раз в 10 мс отправляет пустую задачу в общий executor loop
+и меряет, сколько она ждёт потока — это и есть голодание остальной
+offload-работы.
+"""
+import argparse
+import asyncio
+import os
+import threading
+import time
+
+import numpy as np
+
+
+class StandInS3Client:
+    """Минимум boto3 S3-клиента, который нужен S3Service."""
+
+    class exceptions:
+        class ClientError(Exception):
+            pass
+
+        class NoSuchKey(Exception):
+            pass
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.objects = {}
+        self._lock = threading.Lock()
+
+    def head_bucket(self, Bucket):
+        return {}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        time.sleep(self.latency)
+        with self._lock:
+            self.objects[Key] = len(Body)
+        return {}
+
+
+async def _probe(samples: list, stop: asyncio.Event):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await loop.run_in_executor(None, lambda: None)
+        samples.append(loop.time() - started)
+        await asyncio.sleep(0.01)
+
+
+async def _burst(upload, uploads: int) -> dict:
+    samples: list = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(samples, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(upload(i) for i in range(uploads)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    probe_ms = np.array(samples or [0.0]) * 1000
+    return {
+        "elapsed": elapsed,
+        "probe_p50_ms": float(np.percentile(probe_ms, 50)),
+        "probe_p99_ms": float(np.percentile(probe_ms, 99)),
+        "probe_max_ms": float(probe_ms.max()),
+    }
+
+
+def _print(name: str, result: dict):
+    print(
+        f"{name:<28} burst {result['elapsed']:.2f}s  default executor wait "
+        f"p50 {result['probe_p50_ms']:.1f} ms  p99 {result['probe_p99_ms']:.1f} ms  max {result['probe_max_ms']:.1f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=200)
+    parser.add_argument("--size", type=int, default=64 * 1024, help="размер объекта, байт")
+    parser.add_argument("--latency", type=float, default=0.05, help="задержка put_object заглушки, секунды")
+    parser.add_argument("--endpoint-url", default=None)
+    parser.add_argument("--bucket", default="bench")
+    parser.add_argument("--access-key", default="minioadmin")
+    parser.add_argument("--secret-key", default="minioadmin")
+    args = parser.parse_args()
+
+    # Модуль s3_service создаёт клиента при импорте, поэтому настройки задаются до него
+    for name, value in {
+        "MINIO_ROOT_USER": args.access_key,
+        "MINIO_ROOT_PASSWORD": args.secret_key,
+        "MINIO_DEFAULT_BUCKETS": args.bucket,
+        "MINIO_NETWORK_NAME": "localhost",
+        "MINIO_PORT": "9000",
+        "MINIO_ENDPOINT_URL": args.endpoint_url or "http://localhost:9000",
+        "MINIO_BUCKET_NAME": args.bucket,
+    }.items():
+        os.environ.setdefault(name, value)
+    if args.endpoint_url is None:
+        import boto3
+        stand_in = StandInS3Client(args.latency)
+        boto3.client = lambda *a, **k: stand_in
+
+    from app.services.s3_service import S3Service, minio_settings
+
+    service = S3Service(minio_settings)
+    body = os.urandom(args.size)
+
+    async def legacy_upload(i: int):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None,
+            lambda: service.s3_client.put_object(Bucket=service.bucket, Key=f"bench/legacy/{i}", Body=body),
+        )
+
+    async def service_upload(i: int):
+        await service.upload_file_from_bytes("bench", body, filename=f"{i}.bin", folder="service")
+
+    try:
+        _print("run_in_executor(None, ...)", await _burst(legacy_upload, args.uploads))
+        _print("S3Service dedicated pool", await _burst(service_upload, args.uploads))
+        upload_stats = service.get_stats()["upload"]
+        print(
+            f"S3Service upload queue: waiting max {upload_stats['waiting_max']}, "
+            f"wait max {upload_stats['wait_seconds_max'] * 1000:.0f} ms, completed {upload_stats['completed']}"
+        )
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,162 @@
+"""Пик памяти при параллельных загрузках фото: file.read() + put_object против потоковой загрузки S3Service.
+
+    python -m benchmarks.upload_memory --uploads 8 --size-mb 20
+    python -m benchmarks.upload_memory --endpoint-url http://localhost:9000 --bucket bench
+
+Файлы лежат в SpooledTemporaryFile, как у Starlette UploadFile (после 1 МБ
+уходят на диск). Пик считается tracemalloc по Python-аллокациям процесса.
+Без --endpoint-url настоящий boto3-клиент отвечает сам себе через хук
+botocore before-send: тело запроса вычитывается блоками, как при отправке
+в сеть, поэтому весь путь s3transfer (multipart, части, complete) настоящий.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import tracemalloc
+
+from botocore.awsrequest import AWSResponse
+from starlette.datastructures import Headers, UploadFile
+
+SPOOL_MAX_SIZE = 1024 * 1024
+READ_BLOCK = 64 * 1024
+
+
+class _RawBody:
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def stream(self, **kwargs):
+        yield self.content
+
+    def read(self, *args, **kwargs):
+        content, self.content = self.content, b""
+        return content
+
+
+class StandInS3:
+    """Отвечает на S3-запросы boto3 в процессе, не сохраняя тела."""
+
+    def __init__(self):
+        self.bytes_received = 0
+        self.parts = 0
+
+    def _drain(self, body):
+        if body is None:
+            return
+        if isinstance(body, (bytes, bytearray)):
+            self.bytes_received += len(body)
+            return
+        while True:
+            block = body.read(READ_BLOCK)
+            if not block:
+                break
+            self.bytes_received += len(block)
+
+    def handle(self, request, **kwargs):
+        self._drain(request.body)
+        url = request.url
+        headers = {"ETag": '"stand-in"'}
+        content = b""
+        if request.method == "POST" and "uploads" in url.split("?", 1)[-1].split("&"):
+            content = (
+                b"<InitiateMultipartUploadResult><Bucket>b</Bucket><Key>k</Key>"
+                b"<UploadId>stand-in</UploadId></InitiateMultipartUploadResult>"
+            )
+        elif request.method == "POST" and "uploadId=" in url:
+            content = b"<CompleteMultipartUploadResult><ETag>\"stand-in\"</ETag></CompleteMultipartUploadResult>"
+        elif request.method == "PUT" and "partNumber=" in url:
+            self.parts += 1
+        return AWSResponse(url, 200, headers, _RawBody(content))
+
+
+def _make_upload(size: int, index: int) -> UploadFile:
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    block = os.urandom(READ_BLOCK)
+    for _ in range(size // READ_BLOCK):
+        spool.write(block)
+    spool.seek(0)
+    return UploadFile(spool, size=size, filename=f"{index}.jpg", headers=Headers({"content-type": "image/jpeg"}))
+
+
+async def _measure(upload, uploads: int, size: int) -> float:
+    files = [_make_upload(size, i) for i in range(uploads)]
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    await asyncio.gather(*(upload(f) for f in files))
+    _, peak = tracemalloc.get_traced_memory()
+    for f in files:
+        f.file.close()
+    return (peak - baseline) / 1024 / 1024
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=8)
+    parser.add_argument("--size-mb", type=int, default=20)
+    parser.add_argument("--endpoint-url", default=None)
+    parser.add_argument("--bucket", default="bench")
+    parser.add_argument("--access-key", default="minioadmin")
+    parser.add_argument("--secret-key", default="minioadmin")
+    args = parser.parse_args()
+    size = args.size_mb * 1024 * 1024
+
+    # Модуль s3_service создаёт клиента при импорте, поэтому настройки и хук задаются до него
+    for name, value in {
+        "MINIO_ROOT_USER": args.access_key,
+        "MINIO_ROOT_PASSWORD": args.secret_key,
+        "MINIO_DEFAULT_BUCKETS": args.bucket,
+        "MINIO_NETWORK_NAME": "localhost",
+        "MINIO_PORT": "9000",
+        "MINIO_ENDPOINT_URL": args.endpoint_url or "http://localhost:9000",
+        "MINIO_BUCKET_NAME": args.bucket,
+        "S3_MAX_UPLOAD_SIZE": str(size),
+    }.items():
+        os.environ.setdefault(name, value)
+    stand_in = StandInS3()
+    if args.endpoint_url is None:
+        import boto3
+        real_client = boto3.client
+
+        def stand_in_client(*a, **k):
+            client = real_client(*a, **k)
+            client.meta.events.register("before-send.s3", stand_in.handle)
+            return client
+
+        boto3.client = stand_in_client
+
+    from app.services.s3_service import S3Service, minio_settings
+
+    service = S3Service(minio_settings)
+
+    async def buffered_upload(file: UploadFile):
+        # Прежняя реализация upload_file_get_key
+        content = await file.read()
+        await service._run(
+            "upload",
+            lambda: service.s3_client.put_object(
+                Bucket=service.bucket, Key=f"bench/{file.filename}", Body=content, ContentType=file.content_type
+            ),
+        )
+
+    async def streamed_upload(file: UploadFile):
+        await service.upload_file_get_key("bench", file)
+
+    tracemalloc.start()
+    try:
+        buffered = await _measure(buffered_upload, args.uploads, size)
+        streamed = await _measure(streamed_upload, args.uploads, size)
+    finally:
+        tracemalloc.stop()
+        service.close()
+
+    chunk_mb = minio_settings.s3_multipart_chunksize / 1024 / 1024
+    print(f"{args.uploads} parallel uploads x {args.size_mb} MB, upload concurrency {minio_settings.s3_max_upload_concurrency}")
+    print(f"file.read() + put_object   peak {buffered:8.1f} MB")
+    print(f"S3Service upload_fileobj   peak {streamed:8.1f} MB  (part size {chunk_mb:.0f} MB)")
+    if args.endpoint_url is None:
+        print(f"stand-in received {stand_in.bytes_received / 1024 / 1024:.0f} MB, {stand_in.parts} multipart parts")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""Локальная заглушка VK users.get для проверки фонового обновления профилей.
+
+    python -m benchmarks.vk_stub --port 8081 --rps 3
+    VK_API_URL=http://localhost:8081/method/users.get VK_SERVICE_TOKEN=stub \\
+        python -m app.scripts.refresh_vk_profiles --stale-after-hours 0
+
+Отвечает как VK: профили на все запрошенные id, ошибка 6 при превышении
+--rps и ошибка 100 при пачке больше 1000 id. Счётчики вызовов — на /stats.
+"""
+import argparse
+import asyncio
+import time
+from collections import deque
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+MAX_IDS = 1000
+
+
+def create_stub(rps: float, latency: float) -> FastAPI:
+    app = FastAPI()
+    calls = deque()
+    stats = {"calls": 0, "ids": 0, "rate_limited": 0, "too_many_ids": 0, "max_ids_per_call": 0}
+
+    @app.api_route("/method/users.get", methods=["GET", "POST"])
+    async def users_get(request: Request):
+        params = dict(request.query_params)
+        if request.method == "POST":
+            params.update(await request.form())
+        stats["calls"] += 1
+
+        now = time.monotonic()
+        while calls and now - calls[0] > 1.0:
+            calls.popleft()
+        if len(calls) >= rps:
+            stats["rate_limited"] += 1
+            return {"error": {"error_code": 6, "error_msg": "Too many requests per second"}}
+        calls.append(now)
+
+        ids = [vk_id for vk_id in str(params.get("user_ids", "")).split(",") if vk_id]
+        if len(ids) > MAX_IDS:
+            stats["too_many_ids"] += 1
+            return {"error": {"error_code": 100, "error_msg": "One of the parameters specified was missing or invalid: user_ids is too long"}}
+        stats["ids"] += len(ids)
+        stats["max_ids_per_call"] = max(stats["max_ids_per_call"], len(ids))
+
+        if latency:
+            await asyncio.sleep(latency)
+        return {
+            "response": [
+                {
+                    "id": int(vk_id) if vk_id.isdigit() else vk_id,
+                    "first_name": f"User{vk_id}",
+                    "last_name": "Stub",
+                    "photo_200": f"https://example.invalid/{vk_id}.jpg",
+                    "domain": f"id{vk_id}",
+                    "can_access_closed": True,
+                    "is_closed": False,
+                }
+                for vk_id in ids
+            ]
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--rps", type=float, default=3.0, help="лимит вызовов в секунду, как у VK")
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа, секунды")
+    args = parser.parse_args()
+    uvicorn.run(create_stub(args.rps, args.latency), host=args.host, port=args.port)
@@ -0,0 +1,13 @@
+import sys
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+# app/__init__.py собирает всё приложение и при импорте подключается к S3 и Redis.
+# Юнит-тестам нужны только отдельные модули, поэтому пакет app регистрируется без него.
+if "app" not in sys.modules:
+    package = types.ModuleType("app")
+    package.__path__ = [str(ROOT / "app")]
+    sys.modules["app"] = package
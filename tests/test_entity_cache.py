@@ -0,0 +1,217 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime
+
+import fakeredis
+import pytest
+from sqlalchemy import Column, DateTime, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import declarative_base, make_transient_to_detached
+
+from app.core.config import EntityCacheSettings
+from app.db import cache as cache_module
+from app.db.cache import EntityCache, RowCodec, cached
+
+Base = declarative_base()
+
+
+class Widget(Base):
+    __tablename__ = "widgets"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    title = Column(String)
+    tags = Column(JSONB)
+    created_at = Column(DateTime)
+
+
+CODEC = RowCodec(Widget.__mapper__)
+TABLE = Widget.__tablename__
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeAsyncRedis(server=server)
+    monkeypatch.setattr(cache_module, "get_redis", lambda: client)
+    monkeypatch.setattr(cache_module, "get_pubsub_redis", lambda: fakeredis.FakeAsyncRedis(server=server))
+    return client
+
+
+def make_worker(generation_ttl: float = 1.0) -> EntityCache:
+    return EntityCache(EntityCacheSettings(ENTITY_CACHE_GENERATION_TTL=generation_ttl))
+
+
+def loader(values, calls):
+    async def load():
+        calls.append(values)
+        return dict(values)
+    return load
+
+
+async def wait_until(predicate, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not reached")
+        await asyncio.sleep(0.01)
+
+
+def test_load_started_before_bump_is_never_served(redis):
+    async def scenario():
+        worker = make_worker()
+        release = asyncio.Event()
+        started = asyncio.Event()
+
+        async def stale_load():
+            started.set()
+            await release.wait()
+            return {"title": "old"}
+
+        reader = asyncio.create_task(worker.get(TABLE, "1", stale_load, CODEC))
+        await started.wait()
+        # Запись закоммичена и поколение сдвинуто, пока читатель ещё грузит старую строку
+        await worker.bump(TABLE)
+        release.set()
+        assert await reader == {"title": "old"}
+
+        calls = []
+        assert await worker.get(TABLE, "1", loader({"title": "new"}, calls), CODEC) == {"title": "new"}
+        assert len(calls) == 1
+
+        other = make_worker()
+        assert await other.get(TABLE, "1", loader({"title": "unused"}, calls), CODEC) == {"title": "new"}
+        assert len(calls) == 1
+
+    asyncio.run(scenario())
+
+
+def test_bump_in_one_worker_invalidates_another(redis):
+    async def scenario():
+        worker_a, worker_b = make_worker(), make_worker()
+        calls = []
+        await worker_a.get(TABLE, "1", loader({"title": "v1"}, calls), CODEC)
+        assert await worker_a.get(TABLE, "1", loader({"title": "v1"}, calls), CODEC) == {"title": "v1"}
+        assert len(calls) == 1
+
+        await worker_b.bump(TABLE)
+        assert await worker_a.get(TABLE, "1", loader({"title": "v2"}, calls), CODEC) == {"title": "v2"}
+        assert len(calls) == 2
+
+    asyncio.run(scenario())
+
+
+def test_subscribed_worker_learns_generation_from_pubsub(redis):
+    async def scenario():
+        # Без pub/sub такой воркер минуту верил бы своему поколению
+        worker_a, worker_b = make_worker(generation_ttl=60), make_worker()
+        listener = asyncio.create_task(worker_a.listen())
+        try:
+            await wait_until(lambda: worker_a._subscribed)
+            calls = []
+            await worker_a.get(TABLE, "1", loader({"title": "v1"}, calls), CODEC)
+
+            await worker_b.bump(TABLE)
+            await wait_until(lambda: worker_a._generations.get(TABLE, (0,))[0] == 1)
+            assert await worker_a.get(TABLE, "1", loader({"title": "v2"}, calls), CODEC) == {"title": "v2"}
+            assert len(calls) == 2
+        finally:
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_reads_and_bumps_settle_on_last_write(redis):
+    async def scenario():
+        workers = [make_worker() for _ in range(3)]
+        version = {"value": 0}
+
+        async def load():
+            snapshot = version["value"]
+            await asyncio.sleep(0.001)
+            return {"title": f"v{snapshot}"}
+
+        async def writer(worker):
+            for _ in range(5):
+                version["value"] += 1
+                await worker.bump(TABLE)
+                await asyncio.sleep(0.002)
+
+        async def reader(worker):
+            for _ in range(20):
+                await worker.get(TABLE, "1", load, CODEC)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(writer(workers[0]), *(reader(worker) for worker in workers))
+        expected = {"title": f"v{version['value']}"}
+        for worker in workers:
+            assert await worker.get(TABLE, "1", load, CODEC) == expected
+
+    asyncio.run(scenario())
+
+
+def test_l2_entries_are_json_and_keep_column_types(redis):
+    async def scenario():
+        values = {
+            "id": uuid.uuid4(),
+            "title": "t",
+            "tags": ["a", {"b": 1}],
+            "created_at": datetime(2026, 10, 18, 12, 30, 5, 123456),
+        }
+        await make_worker().get(TABLE, "1", loader(values, []), CODEC)
+        (key,) = [key async for key in redis.scan_iter(f"entity-cache:{TABLE}:*")]
+        assert json.loads(await redis.get(key))["title"] == "t"
+
+        calls = []
+        assert await make_worker().get(TABLE, "1", loader({}, calls), CODEC) == values
+        assert calls == []
+
+    asyncio.run(scenario())
+
+
+def test_malformed_l2_entry_is_a_miss(redis):
+    async def scenario():
+        await redis.set(f"entity-cache:{TABLE}:0:1", b"\x80\x04not-json")
+        calls = []
+        worker = make_worker()
+        assert await worker.get(TABLE, "1", loader({"title": "db"}, calls), CODEC) == {"title": "db"}
+        assert len(calls) == 1
+        assert worker.stats[TABLE].errors == 1
+
+    asyncio.run(scenario())
+
+
+def test_cached_merges_hit_into_session_and_skips_replica_fill(redis, monkeypatch):
+    monkeypatch.setattr(cache_module, "entity_cache", make_worker())
+    widget_id = uuid.uuid4()
+    calls = []
+
+    class WidgetService:
+        def __init__(self, db):
+            self.db = db
+
+        @cached(Widget)
+        async def get_widget_by_id(self, pk):
+            calls.append(pk)
+            # Так строка выглядит после SELECT: persistent-объект в сессии
+            widget = Widget(id=pk, title="t", tags=[], created_at=None)
+            make_transient_to_detached(widget)
+            self.db.add(widget)
+            return widget
+
+    async def scenario():
+        replica = AsyncSession()
+        replica.info["replica"] = True
+        await WidgetService(replica).get_widget_by_id(widget_id)
+        await WidgetService(AsyncSession()).get_widget_by_id(str(widget_id))
+        assert len(calls) == 2
+
+        session = AsyncSession()
+        widget = await WidgetService(session).get_widget_by_id(widget_id)
+        assert len(calls) == 2
+        assert widget in session and widget.title == "t"
+        assert await WidgetService(session).get_widget_by_id(widget_id) is widget
+
+    asyncio.run(scenario())
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from starlette.requests import Request
+
+from app.utils import openapi_cache as openapi_cache_module
+from app.utils.openapi_cache import OpenAPICache, parse_accept_encoding
+
+
+@pytest.fixture
+def app():
+    app = FastAPI(title="test", version="1")
+
+    @app.get("/ping")
+    async def ping():
+        return {}
+
+    return app
+
+
+def negotiate(app: FastAPI, accept_encoding: str):
+    scope = {"type": "http", "app": app, "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    _, encoding, _ = OpenAPICache().get(Request(scope))
+    return encoding
+
+
+def test_parse_accept_encoding_keeps_q_values():
+    assert parse_accept_encoding("gzip;q=0.5, br;q=0, identity, x;q=abc") == {
+        "gzip": 0.5, "br": 0.0, "identity": 1.0, "x": 0.0,
+    }
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("gzip, br", "br"),
+        ("br;q=0, gzip", "gzip"),
+        ("gzip;q=0, br;q=0", None),
+        ("gzip;q=1, br;q=0.5", "gzip"),
+        ("*", "br"),
+        ("*;q=0.5, br;q=0", "gzip"),
+        ("gzip;q=0.5, identity", None),
+        ("", None),
+    ],
+)
+def test_refused_encodings_are_never_sent(app, monkeypatch, header, expected):
+    # brotli необязателен; для выбора кодировки важен только сам факт br-варианта
+    monkeypatch.setattr(openapi_cache_module, "brotli", SimpleNamespace(compress=lambda body, quality: b"br" + body))
+    assert negotiate(app, header) == expected
+
+
+def test_gzip_when_brotli_is_unavailable(app, monkeypatch):
+    monkeypatch.setattr(openapi_cache_module, "brotli", None)
+    assert negotiate(app, "br, gzip;q=0.8") == "gzip"
+    assert negotiate(app, "br, gzip;q=0") is None
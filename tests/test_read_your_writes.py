@@ -0,0 +1,72 @@
+import asyncio
+import uuid
+
+import fakeredis
+import httpx
+import jwt
+import pytest
+from fastapi import FastAPI, Request
+from starlette.requests import Request as StarletteRequest
+
+from app.core.config import DatabaseSettings, JWTSettings
+from app.db import database
+from app.db.database import PRIMARY_STICKY_USER_KEY, ReadYourWritesMiddleware
+
+SECRET = "s" * 32
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    redis = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+    monkeypatch.setattr(database, "get_redis", lambda: redis)
+    monkeypatch.setattr(database, "_db_settings", DatabaseSettings(
+        POSTGRES_NETWORK_NAME="db", POSTGRES_USER="u", POSTGRES_PASSWORD="p", POSTGRES_DB="d", POSTGRES_PORT=5432,
+    ))
+    monkeypatch.setattr(database, "_jwt_settings", JWTSettings(
+        SECRET_KEY=SECRET, REFRESH_TOKEN_SECRET_KEY=SECRET, ACCESS_TOKEN_EXPIRE_MINUTES=5, REFRESH_TOKEN_EXPIRE_MINUTES=5,
+    ))
+    return redis
+
+
+def make_request(headers=None) -> StarletteRequest:
+    raw = [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    return StarletteRequest({"type": "http", "headers": raw})
+
+
+def bearer(user_id, token_type="access") -> dict:
+    return {"Authorization": "Bearer " + jwt.encode({"id": str(user_id), "type": token_type}, SECRET, algorithm="HS256")}
+
+
+def test_write_by_bearer_client_sticks_its_reads_to_primary(settings):
+    user_id = uuid.uuid4()
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.post("/write")
+    async def write(request: Request):
+        # Так выглядит запрос после get_current_user и коммита в primary
+        request.state.user_id = user_id
+        request.state.db_wrote = True
+        return {}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/write")
+        assert await settings.exists(PRIMARY_STICKY_USER_KEY.format(user_id=user_id))
+        assert await database._sticks_to_primary(make_request(bearer(user_id)))
+        assert not await database._sticks_to_primary(make_request(bearer(uuid.uuid4())))
+
+    asyncio.run(scenario())
+
+
+def test_invalid_or_refresh_tokens_do_not_stick(settings):
+    user_id = uuid.uuid4()
+
+    async def scenario():
+        await settings.set(PRIMARY_STICKY_USER_KEY.format(user_id=user_id), 1)
+        assert not await database._sticks_to_primary(make_request(bearer(user_id, token_type="refresh")))
+        assert not await database._sticks_to_primary(make_request({"Authorization": "Bearer garbage"}))
+        assert not await database._sticks_to_primary(make_request())
+
+    asyncio.run(scenario())
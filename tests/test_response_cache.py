@@ -0,0 +1,85 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.core.config import ResponseCacheSettings
+from app.utils import response_cache as response_cache_module
+from app.utils.response_cache import ResponseCache
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+    monkeypatch.setattr(response_cache_module, "get_redis", lambda: client)
+    # fakeredis без lupa не выполняет Lua, а им снимается Redis-лок: лок отпускается только по таймауту
+    monkeypatch.setattr(response_cache_module, "_settings", ResponseCacheSettings(RESPONSE_CACHE_LOCK_TIMEOUT=0.2))
+    return client
+
+
+def test_waiters_share_one_build():
+    async def scenario():
+        cache = ResponseCache("test")
+        calls = []
+
+        async def produce():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return b"body"
+
+        bodies = await asyncio.gather(*(cache.get_or_set(cache.key("a"), cache.gen_key("a"), produce) for _ in range(5)))
+        assert bodies == [b"body"] * 5
+        assert len(calls) == 1
+        assert cache.stats.coalesced == 4
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_builder_does_not_cancel_waiters():
+    async def scenario():
+        cache = ResponseCache("test")
+        started = asyncio.Event()
+        calls = []
+
+        async def produce():
+            calls.append(1)
+            started.set()
+            await asyncio.sleep(0.05)
+            return b"body"
+
+        key, gen_key = cache.key("a"), cache.gen_key("a")
+        owner = asyncio.create_task(cache.get_or_set(key, gen_key, produce))
+        await started.wait()
+        waiters = [asyncio.create_task(cache.get_or_set(key, gen_key, produce)) for _ in range(3)]
+        await asyncio.sleep(0)
+        owner.cancel()
+
+        assert await asyncio.gather(*waiters) == [b"body"] * 3
+        assert owner.cancelled()
+        # Сборку повторяет один из ожидающих, а не каждый
+        assert len(calls) == 2
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_build_running():
+    async def scenario():
+        cache = ResponseCache("test")
+        started = asyncio.Event()
+
+        async def produce():
+            started.set()
+            await asyncio.sleep(0.02)
+            return b"body"
+
+        key, gen_key = cache.key("a"), cache.gen_key("a")
+        owner = asyncio.create_task(cache.get_or_set(key, gen_key, produce))
+        await started.wait()
+        waiter = asyncio.create_task(cache.get_or_set(key, gen_key, produce))
+        await asyncio.sleep(0)
+        waiter.cancel()
+
+        assert await owner == b"body"
+        assert waiter.cancelled()
+
+    asyncio.run(scenario())
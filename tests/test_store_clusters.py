@@ -0,0 +1,53 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.services import store_clusters as store_clusters_module
+from app.services.store_clusters import StoreClusterCache
+from app.utils.tiles import tile_for
+
+POINT = (54.98, 73.37)
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(store_clusters_module, "get_redis", lambda: fakeredis.FakeAsyncRedis(server=server))
+    monkeypatch.setattr(store_clusters_module, "get_pubsub_redis", lambda: fakeredis.FakeAsyncRedis(server=server))
+
+
+def tile_key(zoom: int):
+    return (zoom, *tile_for(*POINT, zoom))
+
+
+def test_invalidation_reaches_other_workers():
+    async def scenario():
+        worker_a, worker_b = StoreClusterCache(100, 300, "clusters"), StoreClusterCache(100, 300, "clusters")
+        listener = asyncio.create_task(worker_a.listen())
+        try:
+            await asyncio.sleep(0.05)
+            worker_a.set(tile_key(12), [{"count": 1}], worker_a.epoch)
+
+            await worker_b.invalidate_point(*POINT)
+            for _ in range(100):
+                if not worker_a.get_many([tile_key(12)])[0]:
+                    break
+                await asyncio.sleep(0.01)
+            assert worker_a.get_many([tile_key(12)]) == ({}, [tile_key(12)])
+        finally:
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+
+def test_clusters_computed_before_invalidation_are_not_stored():
+    async def scenario():
+        cache = StoreClusterCache(100, 300, "clusters")
+        epoch = cache.epoch
+        await cache.invalidate_point(*POINT)
+        cache.set(tile_key(12), [{"count": 1}], epoch)
+        assert cache.get_many([tile_key(12)]) == ({}, [tile_key(12)])
+
+    asyncio.run(scenario())
@@ -0,0 +1,78 @@
+import asyncio
+from typing import List
+
+import httpx
+import pytest
+from fastapi import FastAPI, File, UploadFile
+
+from app.utils.upload_limit import UploadSizeLimitMiddleware
+
+MAX_SIZE = 64 * 1024
+
+
+class Client:
+    """Синхронная обёртка над httpx.AsyncClient: TestClient из starlette 0.27 не работает с httpx 0.28."""
+
+    def __init__(self, app: FastAPI, received: list):
+        self.app = app
+        self.received = received
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        async def send():
+            transport = httpx.ASGITransport(app=self.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post(url, **kwargs)
+        return asyncio.run(send())
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, max_size=MAX_SIZE)
+    received = []
+
+    @app.post("/upload")
+    async def upload(files: List[UploadFile] = File(...)):
+        received.extend(files)
+        return {"files": len(files)}
+
+    @app.post("/echo")
+    async def echo(payload: dict):
+        return payload
+
+    return Client(app, received)
+
+
+def test_small_upload_passes(client):
+    response = client.post("/upload", files={"files": ("a.jpg", b"x" * 1024, "image/jpeg")})
+    assert response.status_code == 200
+    assert response.json() == {"files": 1}
+
+
+def test_declared_oversized_upload_is_rejected_before_parsing(client):
+    response = client.post("/upload", files={"files": ("a.jpg", b"x" * (MAX_SIZE + 1), "image/jpeg")})
+    assert response.status_code == 413
+    assert client.received == []
+
+
+def test_chunked_oversized_upload_is_rejected_while_reading(client):
+    boundary = "limit-test"
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"files\"; filename=\"a.jpg\"\r\n"
+        f"Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + b"x" * (MAX_SIZE * 2) + f"\r\n--{boundary}--\r\n".encode()
+
+    async def chunks():
+        for start in range(0, len(body), 8192):
+            yield body[start:start + 8192]
+
+    response = client.post(
+        "/upload", content=chunks(), headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+    assert response.status_code == 413
+    assert client.received == []
+
+
+def test_non_multipart_bodies_are_not_limited(client):
+    payload = {"text": "x" * (MAX_SIZE + 1)}
+    assert client.post("/echo", json=payload).json() == payload
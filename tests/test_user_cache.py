@@ -0,0 +1,41 @@
+import asyncio
+import uuid
+
+import fakeredis
+import pytest
+
+from app.core.config import UserCacheSettings
+from app.models.users import Users
+from app.utils import user_cache as user_cache_module
+from app.utils.user_cache import UserCache
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(user_cache_module, "get_redis", lambda: fakeredis.FakeAsyncRedis(server=server))
+    monkeypatch.setattr(user_cache_module, "get_pubsub_redis", lambda: fakeredis.FakeAsyncRedis(server=server))
+
+
+def test_bulk_invalidation_reaches_other_workers():
+    async def scenario():
+        settings = UserCacheSettings()
+        worker_a, worker_b = UserCache(settings), UserCache(settings)
+        user_ids = [uuid.uuid4() for _ in range(3)]
+        for user_id in user_ids:
+            worker_a.put(Users(id=user_id, vk_id=str(user_id.int)), worker_a.epoch)
+
+        listener = asyncio.create_task(worker_a.listen())
+        try:
+            await asyncio.sleep(0.05)
+            await worker_b.invalidate_many(user_ids[:2])
+            for _ in range(100):
+                if worker_a.invalidations == 2:
+                    break
+                await asyncio.sleep(0.01)
+            assert [worker_a.get(user_id) is None for user_id in user_ids] == [True, True, False]
+        finally:
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+
+    asyncio.run(scenario())